@@ -0,0 +1,313 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+
+# Directory for pre-generated backgrounds
+POOL_DIR = os.path.join(os.path.dirname(__file__), "pool")
+
+# Pool settings (can be overridden from the .env file)
+# Number of ready backgrounds to keep for each prompt category
+POOL_PER_CATEGORY = int(os.getenv("POOL_PER_CATEGORY", "2"))
+# Hard cap on the number of backgrounds kept on disk
+POOL_MAX_SIZE = int(os.getenv("POOL_MAX_SIZE", "16"))
+# Backgrounds older than this are thrown away, in seconds
+POOL_MAX_AGE = float(os.getenv("POOL_MAX_AGE", str(24 * 3600)))
+# How often the prefetcher checks whether it can refill, in seconds
+POOL_REFILL_INTERVAL = float(os.getenv("POOL_REFILL_INTERVAL", "15"))
+
+
+class BackgroundPool:
+    """Disk-backed pool of pre-generated backgrounds, grouped by category
+
+    A prefetcher task refills each category up to per_category while the
+    bot is idle. When the pool is over max_size, backgrounds from the
+    least recently requested category are evicted first; backgrounds
+    older than max_age are dropped.
+    """
+
+    def __init__(self, categories, generate, directory=POOL_DIR,
+                 per_category=POOL_PER_CATEGORY, max_size=POOL_MAX_SIZE,
+                 max_age=POOL_MAX_AGE, refill_interval=POOL_REFILL_INTERVAL):
+        # Format: {category: [prompt, ...]}
+        self.categories = categories
+        # Coroutine function: generate(prompt) -> image bytes
+        self.generate = generate
+        self.directory = directory
+        self.per_category = per_category
+        self.max_size = max_size
+        self.max_age = max_age
+        self.refill_interval = refill_interval
+
+        # Format: {category: [(created_time, path), ...]}, oldest first
+        self._entries = {category: [] for category in categories}
+        # Format: {category: last time a game asked for it}
+        self._last_used = {category: 0.0 for category in categories}
+        self._task = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.evictions = 0
+        self.refill_time_total = 0.0
+        self.last_refill_time = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_existing()
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _load_existing(self):
+        """Pick up backgrounds left on disk by a previous run"""
+        for filename in os.listdir(self.directory):
+            category, sep, _ = filename.rpartition("__")
+            path = os.path.join(self.directory, filename)
+            if not sep or category not in self._entries:
+                self._remove_file(path)
+                continue
+            self._entries[category].append((os.path.getmtime(path), path))
+
+        for entries in self._entries.values():
+            entries.sort()
+        self._evict()
+
+    def _remove_file(self, path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"Error removing pool file: {e}")
+
+    def _evict(self):
+        """Drop stale backgrounds, then enforce the size cap"""
+        now = time.time()
+        for entries in self._entries.values():
+            while entries and now - entries[0][0] > self.max_age:
+                self._remove_file(entries.pop(0)[1])
+                self.evictions += 1
+
+        while len(self) > self.max_size:
+            # Least recently requested category that still has backgrounds
+            category = min((c for c, entries in self._entries.items() if entries),
+                           key=lambda c: self._last_used[c])
+            self._remove_file(self._entries[category].pop(0)[1])
+            self.evictions += 1
+
+    def take(self, category=None):
+        """Return the bytes of a ready background, or None on a miss
+
+        With no category, any category with a background in stock is used.
+        """
+        self._evict()
+        if category is None:
+            stocked = [c for c, entries in self._entries.items() if entries]
+            category = random.choice(stocked) if stocked else None
+
+        if category is not None:
+            self._last_used[category] = time.time()
+
+        entries = self._entries.get(category)
+        while entries:
+            _, path = entries.pop(0)
+            try:
+                with open(path, "rb") as f:
+                    image_bytes = f.read()
+            except OSError as e:
+                print(f"Error reading pool file: {e}")
+                continue
+            finally:
+                self._remove_file(path)
+            self.hits += 1
+            return image_bytes
+
+        self.misses += 1
+        return None
+
+    def _next_category(self):
+        """Return the category that most needs a background, if any"""
+        missing = [(len(entries), -self._last_used[c], c) for c, entries in self._entries.items()
+                   if len(entries) < self.per_category]
+        if not missing or len(self) >= self.max_size:
+            return None
+        return min(missing)[2]
+
+    async def refill_one(self):
+        """Generate one background for the emptiest category
+
+        Returns True if a background was added.
+        """
+        category = self._next_category()
+        if category is None:
+            return False
+
+        prompt = random.choice(self.categories[category])
+        started = time.time()
+        try:
+            image_bytes = await self.generate(prompt)
+        except Exception as e:
+            self.refill_failures += 1
+            print(f"Error pre-generating background: {e}")
+            return False
+
+        elapsed = time.time() - started
+        self.refills += 1
+        self.refill_time_total += elapsed
+        self.last_refill_time = elapsed
+
+        path = os.path.join(self.directory, f"{category}__{uuid.uuid4().hex[:12]}.png")
+        with open(path, "wb") as f:
+            f.write(image_bytes)
+        self._entries[category].append((time.time(), path))
+        self._evict()
+        return True
+
+    def start(self, is_idle=lambda: True):
+        """Start the prefetcher task; it only generates while is_idle() is true"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._prefetch(is_idle))
+
+    def stop(self):
+        """Stop the prefetcher task"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _prefetch(self, is_idle):
+        while True:
+            added = False
+            if is_idle():
+                added = await self.refill_one()
+            # Keep going straight away while we're catching up
+            if not added:
+                await asyncio.sleep(self.refill_interval)
+
+    def stats(self):
+        """Return pool statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "per_category": {c: len(entries) for c, entries in self._entries.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "refills": self.refills,
+            "refill_failures": self.refill_failures,
+            "evictions": self.evictions,
+            "avg_refill_time": self.refill_time_total / self.refills if self.refills else None,
+            "last_refill_time": self.last_refill_time,
+        }
+
+
+# Background sharing settings (can be overridden from the .env file)
+# Games (each in a different channel) that can be made from one generated background
+BACKGROUND_REUSES = int(os.getenv("BACKGROUND_REUSES", "3"))
+# How long a background stays available for other channels, in seconds
+BACKGROUND_REUSE_TTL = float(os.getenv("BACKGROUND_REUSE_TTL", "600"))
+
+
+class SharedBackground:
+    """A background (ready or still being generated) and the channels using it"""
+
+    def __init__(self, future, uses, channel_id):
+        # Resolves to the image bytes
+        self.future = future
+        self.uses_left = uses - 1
+        self.channels = {str(channel_id)}
+        self.created = time.time()
+
+
+class SharedBackgrounds:
+    """Hands one generated background to several games in different channels
+
+    Every game still gets its own Benny placement, so one inference call
+    can feed up to `uses` games. Requests that arrive while a background
+    is being generated wait for that one instead of starting another, so
+    a burst of requests from several channels costs a single generation.
+    A background is never reused in the same channel.
+    """
+
+    def __init__(self, uses=BACKGROUND_REUSES, max_age=BACKGROUND_REUSE_TTL):
+        self.uses = max(1, uses)
+        self.max_age = max_age
+        # Oldest first
+        self._entries = []
+        self.generations = 0
+        self.reused = 0
+
+    def __len__(self):
+        """Number of ready backgrounds with uses left"""
+        now = time.time()
+        return sum(1 for entry in self._entries
+                   if entry.future.done() and entry.uses_left > 0 and now - entry.created < self.max_age)
+
+    def _evict(self, now):
+        self._entries = [entry for entry in self._entries
+                         if not entry.future.done()
+                         or (entry.uses_left > 0 and now - entry.created < self.max_age)]
+
+    def _claim(self, channel_id, pending=False):
+        """Take a use of a background this channel hasn't played yet"""
+        now = time.time()
+        self._evict(now)
+        channel_id = str(channel_id)
+        for entry in self._entries:
+            if entry.uses_left <= 0 or channel_id in entry.channels or not (pending or entry.future.done()):
+                continue
+            entry.uses_left -= 1
+            entry.channels.add(channel_id)
+            self.reused += 1
+            return entry
+        return None
+
+    def take(self, channel_id):
+        """Return the bytes of a ready background for this channel, or None"""
+        entry = self._claim(channel_id)
+        return entry.future.result() if entry else None
+
+    def add(self, image_bytes, channel_id):
+        """Offer a background used by channel_id to other channels"""
+        if self.uses > 1:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(image_bytes)
+            self._entries.append(SharedBackground(future, self.uses, channel_id))
+
+    async def get(self, channel_id, generate):
+        """Return a background for channel_id, generating one only if needed
+
+        generate is a coroutine function returning image bytes. If a
+        background is ready or already being generated for another
+        channel, that one is used instead.
+        """
+        entry = self._claim(channel_id, pending=True)
+        if entry is not None:
+            return await asyncio.shield(entry.future)
+
+        entry = SharedBackground(asyncio.get_running_loop().create_future(), self.uses, channel_id)
+        self.generations += 1
+        if self.uses > 1:
+            self._entries.append(entry)
+        try:
+            image_bytes = await generate()
+        except BaseException as e:
+            # Waiters get an ordinary error, even if this task was cancelled
+            error = e if isinstance(e, Exception) else RuntimeError("Background generation was cancelled")
+            entry.future.set_exception(error)
+            # Mark it as retrieved, in case nobody else was waiting
+            entry.future.exception()
+            if entry in self._entries:
+                self._entries.remove(entry)
+            raise
+        entry.future.set_result(image_bytes)
+        return image_bytes
+
+    def stats(self):
+        """Return generations started and games that reused a background"""
+        return {
+            "ready": len(self),
+            "generating": sum(1 for entry in self._entries if not entry.future.done()),
+            "generations": self.generations,
+            "reused": self.reused,
+        }
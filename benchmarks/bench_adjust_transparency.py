@@ -0,0 +1,68 @@
+"""Benchmark adjust_transparency against the old per-pixel implementation
+
+Benny is scaled to the heights the Compositor picks for a 1024x1024
+background, from the default 3-8% range up to a raised max_height_percent.
+
+Usage: python benchmarks/bench_adjust_transparency.py
+"""
+import os
+import sys
+import timeit
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benny_sprite import adjust_transparency
+
+BENNY_IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benny.png")
+
+BACKGROUND_HEIGHT = 1024
+HEIGHT_PERCENTS = [0.03, 0.08, 0.15, 0.25, 0.5]
+
+
+def adjust_transparency_per_pixel(img, alpha_factor=0.85):
+    """The original implementation, kept here for comparison"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+
+    data = img.getdata()
+    new_data = []
+
+    for item in data:
+        new_data.append((item[0], item[1], item[2], int(item[3] * alpha_factor) if len(item) > 3 else 255))
+
+    img.putdata(new_data)
+    return img
+
+
+def load_benny():
+    """Load benny.png, or a stand-in sprite with the same kind of alpha mask"""
+    if os.path.exists(BENNY_IMAGE_PATH):
+        return Image.open(BENNY_IMAGE_PATH).convert('RGBA')
+    return Image.radial_gradient('L').resize((200, 300)).convert('RGBA')
+
+
+def main():
+    benny_img = load_benny()
+    width, height = benny_img.size
+
+    print(f"{'height':>8} {'pixels':>10} {'per-pixel ms':>14} {'LUT ms':>10} {'speedup':>9}")
+    for percent in HEIGHT_PERCENTS:
+        new_height = int(BACKGROUND_HEIGHT * percent)
+        new_width = int((new_height / height) * width)
+        sprite = benny_img.resize((new_width, new_height))
+
+        # Both implementations must agree
+        expected = adjust_transparency_per_pixel(sprite.copy(), 0.9)
+        actual = adjust_transparency(sprite.copy(), 0.9)
+        assert expected.tobytes() == actual.tobytes()
+
+        number = max(3, 2000 // new_height)
+        old = min(timeit.repeat(lambda: adjust_transparency_per_pixel(sprite.copy(), 0.9), number=number, repeat=3)) / number
+        new = min(timeit.repeat(lambda: adjust_transparency(sprite.copy(), 0.9), number=number, repeat=3)) / number
+
+        print(f"{new_height:>8} {new_width * new_height:>10} {old * 1000:>14.3f} {new * 1000:>10.3f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
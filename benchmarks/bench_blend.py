@@ -0,0 +1,74 @@
+"""How far Benny's colour is from his surroundings, with and without blending
+
+For each game Benny is placed on a tinted background and the distance
+between his average colour and the average colour around him is
+measured (RGB Euclidean, lower = blends in better), along with the time
+the blend stage takes.
+
+Usage: python benchmarks/bench_blend.py [--games 100] [background.png]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from PIL import Image, ImageFilter, ImageStat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compositor import BLEND_STRENGTH, RegionStats, blend_sprite, clutter_placement
+from bench_compositor import load_sprites
+
+
+def make_background():
+    noise = Image.effect_noise((1024, 1024), 48).filter(ImageFilter.GaussianBlur(1.5))
+    # A warm, darkish scene so an untouched Benny stands out
+    return Image.merge("RGB", [noise, noise.point(lambda v: v // 2), noise.point(lambda v: v // 3)])
+
+
+def colour_distance(first, second):
+    return sum((a - b) ** 2 for a, b in zip(first, second)) ** 0.5
+
+
+def mean_colour(sprite):
+    return ImageStat.Stat(sprite.convert("RGB"), mask=sprite.getchannel("A")).mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--strength", type=float, default=BLEND_STRENGTH or 0.35)
+    parser.add_argument("background", nargs="?")
+    args = parser.parse_args()
+
+    background = Image.open(args.background).convert("RGB") if args.background else make_background()
+    sprites = load_sprites()
+    rng = random.Random(1)
+
+    started = time.perf_counter()
+    stats = RegionStats(background)
+    stats.channels
+    stats_time = time.perf_counter() - started
+
+    plain_distance = blended_distance = blend_time = 0.0
+    for _ in range(args.games):
+        sprite = sprites.get(rng.randint(30, 80))
+        x_pos, y_pos = clutter_placement(background, sprite.size, rng, stats)
+        surroundings = stats.mean_colour((x_pos, y_pos, sprite.width, sprite.height))
+
+        started = time.perf_counter()
+        blended = blend_sprite(sprite, surroundings, args.strength)
+        blend_time += time.perf_counter() - started
+
+        plain_distance += colour_distance(mean_colour(sprite), surroundings)
+        blended_distance += colour_distance(mean_colour(blended), surroundings)
+
+    print(f"Background {background.width}x{background.height}, {args.games} games, strength {args.strength}")
+    print(f"Region stats (once per background): {stats_time * 1000:.2f} ms")
+    print(f"Blend per game: {blend_time / args.games * 1000:.2f} ms")
+    print(f"Colour distance to surroundings: {plain_distance / args.games:.1f} plain, "
+          f"{blended_distance / args.games:.1f} blended")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Throughput of the server-side click check
+
+Starts the web server in-process on a free port, creates one game and has
+N players spam POST /click/<id> over keep-alive connections (mostly misses,
+every 10th click a hit), with the miss budget lifted since every player
+shares one IP here. Also times check_click on its own, confirms that
+/found/ is refused without the token from a verified hit, and that a
+script sweeping the image is cut off by the miss budget (429).
+
+Usage: python benchmarks/bench_click_check.py [--clients 50] [--clicks 200]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+import timeit
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_server
+from rate_limiter import KeyedRateLimiter
+
+
+def run_player(port, game_id, clicks, results, start_event):
+    """Send clicks over one connection; records (hits, errors)"""
+    start_event.wait()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    hits = errors = 0
+    for i in range(clicks):
+        # Benny is at (100, 100); every 10th click lands on him
+        body = "110,120" if i % 10 == 0 else f"{500 + i % 400},{600 - i % 300}"
+        try:
+            conn.request("POST", f"/click/{game_id}", body=body)
+            response = conn.getresponse()
+            result = json.loads(response.read())
+            hits += result["hit"]
+        except Exception:
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.close()
+    results.append((hits, errors))
+
+
+def sweep(port, game_id, step=60):
+    """Click a grid over the image until Benny or a 429 turns up; returns (clicks, status)"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    clicks = 0
+    try:
+        for y in range(0, 1024, step):
+            for x in range(0, 1024, step):
+                conn.request("POST", f"/click/{game_id}", body=f"{x},{y}")
+                response = conn.getresponse()
+                body = response.read()
+                clicks += 1
+                if response.status != 200:
+                    return clicks, response.status
+                if json.loads(body)["hit"]:
+                    return clicks, "hit"
+    finally:
+        conn.close()
+    return clicks, "nothing found"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--clicks", type=int, default=200, help="clicks per client")
+    args = parser.parse_args()
+
+    server = web_server.PooledHTTPServer(("127.0.0.1", 0), web_server.WhereIsBennyHandler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    game_id, _ = web_server.create_game(Image.new("RGB", (1024, 1024)), 100, 100, 40, 80, 0, 0, "bench", None)
+    game = web_server.active_games[game_id]
+
+    per_check = timeit.timeit(lambda: web_server.check_click(game, 500, 600), number=200000) / 200000
+
+    # Throughput only: all the players below come from 127.0.0.1
+    limiter = web_server.click_limiter
+    web_server.click_limiter = KeyedRateLimiter(1e9, 1e9)
+
+    results = []
+    start_event = threading.Event()
+    threads = [threading.Thread(target=run_player, args=(port, game_id, args.clicks, results, start_event))
+               for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", f"/found/{game_id}?user=cheater")
+    cheat_status = conn.getresponse().status
+    conn.close()
+
+    # A script sweeping the image, Benny tucked into the far corner
+    web_server.click_limiter = limiter
+    sweep_id, _ = web_server.create_game(Image.new("RGB", (1024, 1024)), 900, 900, 40, 80, 0, 0, "bench", None)
+    sweep_clicks, sweep_result = sweep(port, sweep_id)
+
+    web_server.remove_game(game_id)
+    web_server.remove_game(sweep_id)
+    server.shutdown()
+    server.server_close()
+
+    clicks = args.clients * args.clicks
+    print(f"check_click:  {per_check * 1e9:.0f} ns per call")
+    print(f"Clicks:       {clicks} in {elapsed:.2f}s ({clicks / elapsed:.0f} clicks/s)")
+    print(f"Hits:         {sum(hits for hits, errors in results)}")
+    print(f"Errors:       {sum(errors for hits, errors in results)}")
+    print(f"/found/ without a verified hit: {cheat_status}")
+    print(f"Grid sweep:   stopped after {sweep_clicks} clicks with {sweep_result} "
+          f"(budget {web_server.CLICK_MISS_BURST} misses, +{web_server.CLICK_MISS_RATE}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Allocations and time per game: the old copy-then-paste path vs the Compositor
+
+"copy" is how games used to be built: decode the background, copy the
+whole frame, paste Benny onto the copy and encode. "in place" is
+Compositor.compose_bytes, which pastes straight onto the decoded frame.
+Pillow image allocations are counted with Image.core.get_stats(), Python
+allocations with tracemalloc.
+
+Usage: python benchmarks/bench_compositor.py [--games 20] [background.png]
+"""
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benny_sprite import SpriteCache
+from compositor import Compositor, grid_placement
+from image_pipeline import decode_image, encode_variants
+
+BENNY_IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benny.png")
+
+
+def load_background_bytes(path):
+    if path:
+        with open(path, "rb") as background_file:
+            return background_file.read()
+    noise = Image.effect_noise((1024, 1024), 48).filter(ImageFilter.GaussianBlur(1.5))
+    buffer = io.BytesIO()
+    Image.merge("RGB", [noise, noise.rotate(90), noise.rotate(180)]).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def load_sprites():
+    """SpriteCache for benny.png, or for a stand-in sprite if it's missing"""
+    path = BENNY_IMAGE_PATH
+    if not os.path.exists(path):
+        path = os.path.join(tempfile.mkdtemp(), "benny.png")
+        Image.radial_gradient("L").resize((200, 300)).convert("RGBA").save(path)
+    sprites = SpriteCache(path)
+    sprites.load()
+    return sprites
+
+
+def compose_with_copy(image_bytes, sprites, rng):
+    """The old path: paste onto a full-frame copy of the background"""
+    background = decode_image(image_bytes)
+    height = rng.randint(int(background.height * 0.03), int(background.height * 0.08))
+    sprite = sprites.get(height)
+    x_pos, y_pos = grid_placement(background, sprite.size, rng)
+    final_img = background.copy()
+    final_img.paste(sprite, (x_pos, y_pos), sprite)
+    return encode_variants(final_img)
+
+
+def measure(name, compose, games):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = Image.core.get_stats()
+    started = time.perf_counter()
+    for _ in range(games):
+        compose()
+    elapsed = time.perf_counter() - started
+    after = Image.core.get_stats()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    images = (after["new_count"] - before["new_count"]) / games
+    blocks = (after["allocated_blocks"] - before["allocated_blocks"]) / games
+    print(f"{name:>10} {images:>12.1f} {blocks:>14.1f} {peak / 1048576:>12.1f} {elapsed / games * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("background", nargs="?")
+    args = parser.parse_args()
+
+    image_bytes = load_background_bytes(args.background)
+    sprites = load_sprites()
+    # Same placement as the copy path and no blending, so only copy vs in place differs
+    compositor = Compositor(sprites, placement=grid_placement, blend_strength=0, rng=random.Random(1))
+    rng = random.Random(1)
+
+    # Warm up both paths (sprite variants, codec setup)
+    compose_with_copy(image_bytes, sprites, rng)
+    compositor.compose_bytes(image_bytes)
+
+    width, height = decode_image(image_bytes).size
+    print(f"Background {width}x{height}, {args.games} games each")
+    print(f"{'path':>10} {'images/game':>12} {'pil blocks/game':>14} {'py peak MB':>12} {'ms/game':>9}")
+    measure("copy", lambda: compose_with_copy(image_bytes, sprites, rng), args.games)
+    measure("in place", lambda: compositor.compose_bytes(image_bytes), args.games)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Fan-out of live game events to many open game pages
+
+Starts the web server in-process, opens N Server-Sent Event streams to
+one game (far more than there are worker threads), then claims the win
+and measures how long it takes until every stream has the "found" event.
+
+Usage: python benchmarks/bench_event_fanout.py [--clients 1000] [--workers 32]
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import selectors
+import threading
+import http.client
+import resource
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_server
+
+
+def open_stream(port, game_id):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(f"GET /events/{game_id} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n".encode())
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=web_server.WEB_WORKERS)
+    args = parser.parse_args()
+
+    # Each stream needs a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.clients * 2 + 256)), hard))
+
+    server = web_server.PooledHTTPServer(("127.0.0.1", 0), web_server.WhereIsBennyHandler, workers=args.workers)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    web_server.event_hub.start()
+
+    game_id, _ = web_server.create_game(Image.new("RGB", (256, 256)), 10, 10, 20, 20, 0, 0, "bench", None)
+    token = web_server.active_games[game_id]["win_token"]
+
+    started = time.perf_counter()
+    streams = [open_stream(port, game_id) for _ in range(args.clients)]
+    selector = selectors.DefaultSelector()
+    received = {sock: b"" for sock in streams}
+    for sock in streams:
+        selector.register(sock, selectors.EVENT_READ)
+
+    def read_until(marker, timeout=30):
+        waiting = {sock for sock in streams if marker not in received[sock]}
+        deadline = time.time() + timeout
+        while waiting and time.time() < deadline:
+            for key, events in selector.select(timeout=1):
+                data = key.fileobj.recv(4096)
+                received[key.fileobj] += data
+                if marker in received[key.fileobj] or not data:
+                    waiting.discard(key.fileobj)
+        return len(streams) - len(waiting)
+
+    connected = read_until(b"event: hello")
+    # Give the hub a moment to take over the last sockets
+    while web_server.event_hub.stats()["clients"] < connected and time.perf_counter() - started < 30:
+        time.sleep(0.01)
+    connect_time = time.perf_counter() - started
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    published = time.perf_counter()
+    conn.request("GET", f"/found/{game_id}?user=bench&token={token}")
+    status = conn.getresponse().status
+    delivered = read_until(b"event: found")
+    fanout_time = time.perf_counter() - published
+
+    print(f"Streams:   {connected}/{args.clients} open in {connect_time:.2f}s on {args.workers} worker threads")
+    print(f"/found/:   {status}")
+    print(f"Delivered: {delivered}/{connected} found events in {fanout_time * 1000:.1f} ms")
+    print(f"Hub:       {web_server.event_hub.stats()}")
+
+    for sock in streams:
+        sock.close()
+    server.shutdown()
+    server.server_close()
+    web_server.event_hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare render time and bytes per hit of the game page
+
+"inline" rebuilds the whole page with its CSS and JS through one big
+f-string on every hit, the way the page used to be generated. "template"
+is the compiled template from page_templates, with the CSS and JS served
+once from /static/ and cached by the browser afterwards.
+
+Usage: python benchmarks/bench_game_page.py [--iterations 20000]
+"""
+import os
+import sys
+import time
+import gzip
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_server
+
+CSS = web_server.STATIC_ASSETS["game.css"].encodings["identity"].decode()
+JS = web_server.STATIC_ASSETS["game.js"].encodings["identity"].decode()
+
+
+def render_inline(game_id, game):
+    """The old approach: the full page, CSS and JS included, built per hit"""
+    x, y = game["x_pos"], game["y_pos"]
+    width, height = game["width"], game["height"]
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Where's Benny?</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
+        <style>{CSS}</style>
+    </head>
+    <body data-game-id="{game_id}" data-time-left="{int(game["expiry_time"] - time.time())}">
+        <div class="container">
+            <h1>Where's Benny?</h1>
+            <div class="game-image" id="gameImageContainer" data-x="{x}" data-y="{y}" data-width="{width}" data-height="{height}">
+                <img src="/images/{game_id}.png" id="gameImage" alt="Where's Benny?">
+            </div>
+            <div class="timer">Game expires in <span id="countdown">5:00</span></div>
+        </div>
+        <script>{JS}</script>
+    </body>
+    </html>
+    """
+    return html.encode()
+
+
+def measure(render, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        page = render()
+    return (time.perf_counter() - started) / iterations, page
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    game_id = "0123456789ab"
+    game = {"x_pos": 412, "y_pos": 233, "width": 61, "height": 74, "expiry_time": time.time() + 300}
+
+    # The first hit on a game compiles its page; later hits reuse it
+    web_server.generate_game_html(game_id, game)
+
+    inline_time, inline_page = measure(lambda: render_inline(game_id, game), args.iterations)
+    template_time, template_page = measure(lambda: web_server.generate_game_html(game_id, game), args.iterations)
+
+    # Bytes on the wire for the assets the first time a browser sees them
+    asset_bytes = sum(len(asset.choose_encoding("gzip")[1]) for asset in web_server.STATIC_ASSETS.values())
+
+    print(f"{'page':>10} {'render us':>10} {'bytes/hit':>10} {'gzip/hit':>10}")
+    print(f"{'inline':>10} {inline_time * 1e6:>10.1f} {len(inline_page):>10} {len(gzip.compress(inline_page)):>10}")
+    print(f"{'template':>10} {template_time * 1e6:>10.1f} {len(template_page):>10} {len(gzip.compress(template_page)):>10}")
+    print(f"static assets: {asset_bytes} bytes gzipped, fetched once per browser then served from cache")
+
+
+if __name__ == "__main__":
+    main()
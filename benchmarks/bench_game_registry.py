@@ -0,0 +1,82 @@
+"""Benchmark GameRegistry against the old linear scan over active_games
+
+Registers 100k simulated games, then times "does this user have an active
+game?" lookups and pruning of the games that expired since the last pass.
+
+Usage: python benchmarks/bench_game_registry.py [--games 100000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_registry import GameRegistry
+
+
+def user_has_active_game_scan(active_games, user_id, current_time):
+    """The original linear scan, kept here for comparison"""
+    for game_id, game_data in active_games.items():
+        if game_data["expiry_time"] > current_time and str(game_data["creator_user_id"]) == str(user_id):
+            return game_id
+    return None
+
+
+def make_games(count, now):
+    games = {}
+    for i in range(count):
+        games[f"game{i:08d}"] = {
+            "expiry_time": now + random.uniform(0, 300),
+            "discord_channel_id": random.randint(1, 500),
+            "creator_user_id": i,
+        }
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100000)
+    args = parser.parse_args()
+
+    now = time.time()
+    games = make_games(args.games, now)
+    registry = GameRegistry()
+    for game_id, game in games.items():
+        registry.add(game_id, game)
+
+    # Users without a game are the worst case for the scan
+    missing_user = args.games + 1
+    present_user = random.randint(0, args.games - 1)
+
+    number = 20
+    scan_missing = timeit.timeit(lambda: user_has_active_game_scan(games, missing_user, now), number=number) / number
+    index_missing = timeit.timeit(lambda: registry.find_by_creator(missing_user, now), number=number * 1000) / (number * 1000)
+    scan_present = timeit.timeit(lambda: user_has_active_game_scan(games, present_user, now), number=number) / number
+    index_present = timeit.timeit(lambda: registry.find_by_creator(present_user, now), number=number * 1000) / (number * 1000)
+
+    print(f"{args.games} active games")
+    print(f"{'lookup':>22} {'scan us':>12} {'index us':>10} {'speedup':>10}")
+    print(f"{'user without a game':>22} {scan_missing * 1e6:>12.1f} {index_missing * 1e6:>10.2f} {scan_missing / index_missing:>9.0f}x")
+    print(f"{'user with a game':>22} {scan_present * 1e6:>12.1f} {index_present * 1e6:>10.2f} {scan_present / index_present:>9.0f}x")
+
+    # Prune one second's worth of expiries, like a cleanup pass would
+    prune_at = now + 1
+    started = time.perf_counter()
+    expired = [game_id for game_id, game in games.items() if prune_at > game["expiry_time"]]
+    scan_prune = time.perf_counter() - started
+
+    started = time.perf_counter()
+    due = registry.pop_expired(prune_at)
+    for game_id in due:
+        registry.remove(game_id)
+    index_prune = time.perf_counter() - started
+
+    assert sorted(expired) == sorted(due)
+    print(f"Pruning {len(due)} due games: scan {scan_prune * 1000:.2f} ms, heap {index_prune * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
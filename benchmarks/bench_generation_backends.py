@@ -0,0 +1,108 @@
+"""Generation throughput and queueing against offline backends
+
+Pushes a burst of game requests through the bot's GenerationQueue and
+SharedBackgrounds, with backgrounds coming from one of the stand-in
+backends instead of the Hugging Face API:
+
+    procedural - scenes drawn locally (measures the bot's own overhead)
+    fake       - the real HuggingFaceClient against the fake inference
+                 server, which answers 503 + estimated_time while "loading"
+
+Reports throughput, time from request to background (mean/p95/max), how
+often players would have seen a "model is loading" notice and, for the
+fake server, the longest line of requests waiting for its GPU.
+
+Usage: python benchmarks/bench_generation_backends.py [--backend fake] [--requests 20]
+           [--channels 5] [--workers 2] [--reuses 1] [--latency 0.5] [--loading 2] [--concurrency 1]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hf_client
+from background_pool import SharedBackgrounds
+from generation_queue import GenerationQueue, GenerationJob
+from image_generators import FakeServerGenerator, ProceduralGenerator
+
+PAYLOAD = {"inputs": "a crowded beach scene in the style of Where's Waldo", "parameters": {}}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["procedural", "fake"], default="fake")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--reuses", type=int, default=1, help="games per background (SharedBackgrounds)")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake server: seconds per image")
+    parser.add_argument("--loading", type=float, default=2, help="fake server: model loading time")
+    parser.add_argument("--concurrency", type=int, default=1, help="fake server: images at once")
+    args = parser.parse_args()
+
+    if args.backend == "fake":
+        generator = FakeServerGenerator(latency=args.latency, loading_time=args.loading,
+                                        concurrency=args.concurrency, images=2)
+    else:
+        generator = ProceduralGenerator(seed=1)
+    shared = SharedBackgrounds(uses=args.reuses)
+    queue = GenerationQueue(workers=args.workers, max_pending=args.requests, max_per_guild=args.requests)
+
+    latencies = []
+    errors = []
+    loading_notices = 0
+    done = asyncio.Event()
+
+    def make_job(channel_id, queued_at):
+        async def on_loading(wait_time):
+            nonlocal loading_notices
+            loading_notices += 1
+
+        async def job():
+            try:
+                await shared.get(channel_id, lambda: generator.generate(PAYLOAD, on_loading=on_loading))
+                latencies.append(time.perf_counter() - queued_at)
+            except hf_client.GenerationError as e:
+                errors.append(e)
+            finally:
+                if len(latencies) + len(errors) == args.requests:
+                    done.set()
+        return job
+
+    started = time.perf_counter()
+    for i in range(args.requests):
+        channel_id = i % args.channels
+        if shared.take(channel_id):
+            latencies.append(0.0)
+            continue
+        await queue.submit(GenerationJob(channel_id, i, make_job(channel_id, time.perf_counter())))
+    if len(latencies) + len(errors) < args.requests:
+        await done.wait()
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+    await generator.close()
+
+    print(f"Backend {args.backend}, {args.requests} requests from {args.channels} channels, "
+          f"{args.workers} queue workers, {args.reuses} games per background")
+    if args.backend == "fake":
+        print(f"Fake server: {args.latency}s per image, {args.loading}s loading, {args.concurrency} at once")
+    print(f"Done in {elapsed:.2f}s: {len(latencies) / elapsed:.2f} games/s, {len(errors)} errors")
+    if latencies:
+        print(f"Request to background: mean {sum(latencies) / len(latencies):.2f}s, "
+              f"p95 {percentile(latencies, 95):.2f}s, max {max(latencies):.2f}s")
+    print(f"Loading notices: {loading_notices}, generations: {shared.stats()['generations']}")
+    if args.backend == "fake":
+        print(f"Fake server stats: {generator.server.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Compare payload size and encode time of the game image formats
+
+Uses a background image passed on the command line, or a synthetic
+1024x1024 scene with SDXL-like detail.
+
+Usage: python benchmarks/bench_image_formats.py [background.png]
+"""
+import os
+import sys
+import time
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_pipeline import encode_image
+
+
+def load_background():
+    if len(sys.argv) > 1:
+        return Image.open(sys.argv[1]).convert("RGB")
+    noise = Image.effect_noise((1024, 1024), 48).filter(ImageFilter.GaussianBlur(1.5))
+    return Image.merge("RGB", [noise, noise.rotate(90), noise.rotate(180)])
+
+
+def main():
+    background = load_background()
+
+    results = []
+    for fmt in ["png", "webp", "jpeg"]:
+        started = time.perf_counter()
+        data = encode_image(background, fmt)
+        results.append((fmt, len(data), time.perf_counter() - started))
+
+    png_size = results[0][1]
+    print(f"{'format':>8} {'bytes':>10} {'vs png':>8} {'encode ms':>10}")
+    for fmt, size, elapsed in results:
+        print(f"{fmt:>8} {size:>10} {size / png_size:>7.0%} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
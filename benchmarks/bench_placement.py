@@ -0,0 +1,67 @@
+"""Time per placement and how busy the chosen spots are: grid vs clutter
+
+The test scene is half flat sky, half noisy "crowd", like a typical
+landscape where the 3x3 grid often drops Benny into the open. For each
+mode the benchmark reports ms per placement and the average edge
+strength under Benny's box (higher = busier spot, better hidden).
+
+Usage: python benchmarks/bench_placement.py [--placements 200] [background.png]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compositor import RegionStats, clutter_placement, grid_placement
+
+# Typical Benny size on a 1024x1024 background (3-8% of the height)
+SPRITE_SIZE = (40, 60)
+
+
+def make_background():
+    noise = Image.effect_noise((1024, 1024), 48).filter(ImageFilter.GaussianBlur(1.5))
+    background = Image.merge("RGB", [noise, noise.rotate(90), noise.rotate(180)])
+    ImageDraw.Draw(background).rectangle((0, 0, 1023, 511), fill=(120, 170, 230))
+    return background
+
+
+def measure(name, placement, background, placements, clutter):
+    rng = random.Random(1)
+    box_width = max(1, round(SPRITE_SIZE[0] * clutter.scale_x))
+    box_height = max(1, round(SPRITE_SIZE[1] * clutter.scale_y))
+    busy = 0
+    started = time.perf_counter()
+    positions = [placement(background, SPRITE_SIZE, rng) for _ in range(placements)]
+    elapsed = time.perf_counter() - started
+    # Edge strength of every box position, looked up for each placement
+    sums = clutter.box_sums(box_width, box_height)
+    columns = clutter.width - box_width + 1
+    for x_pos, y_pos in positions:
+        map_x = min(int(x_pos * clutter.scale_x), columns - 1)
+        map_y = min(int(y_pos * clutter.scale_y), clutter.height - box_height)
+        busy += sums[map_y * columns + map_x]
+    average = busy / placements / (box_width * box_height)
+    print(f"{name:>8} {elapsed / placements * 1000:>8.2f} {average:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--placements", type=int, default=200)
+    parser.add_argument("background", nargs="?")
+    args = parser.parse_args()
+
+    background = Image.open(args.background).convert("RGB") if args.background else make_background()
+    clutter = RegionStats(background)
+    print(f"Background {background.width}x{background.height}, map {clutter.width}x{clutter.height}, "
+          f"sprite {SPRITE_SIZE[0]}x{SPRITE_SIZE[1]}, {args.placements} placements each")
+    print(f"{'mode':>8} {'ms/place':>8} {'edge strength':>14}")
+    measure("grid", grid_placement, background, args.placements, clutter)
+    measure("clutter", clutter_placement, background, args.placements, clutter)
+
+
+if __name__ == "__main__":
+    main()
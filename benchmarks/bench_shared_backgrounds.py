@@ -0,0 +1,74 @@
+"""Games per generation with and without background sharing
+
+Simulates a burst of game requests from several channels going through
+the GenerationQueue, with a stand-in generator that takes --latency
+seconds per image. Reports how many generations were needed, the wall
+time until every game had a background, and the mean wait per game.
+
+Usage: python benchmarks/bench_shared_backgrounds.py [--requests 30] [--channels 10] [--latency 0.5]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from background_pool import SharedBackgrounds
+from generation_queue import GenerationQueue, GenerationJob
+
+
+async def run(uses, requests, channels, latency, workers):
+    shared = SharedBackgrounds(uses=uses)
+    queue = GenerationQueue(workers=workers, max_pending=requests, max_per_guild=requests)
+    waits = []
+    done = asyncio.Event()
+
+    async def generate():
+        await asyncio.sleep(latency)
+        return b"background"
+
+    def make_job(channel_id, queued_at):
+        async def job():
+            await shared.get(channel_id, generate)
+            waits.append(time.perf_counter() - queued_at)
+            if len(waits) == requests:
+                done.set()
+        return job
+
+    started = time.perf_counter()
+    for i in range(requests):
+        channel_id = i % channels
+        # Ready backgrounds are handed out without queueing, like in where_is_benny
+        if shared.take(channel_id):
+            waits.append(0.0)
+            continue
+        await queue.submit(GenerationJob(channel_id, i, make_job(channel_id, time.perf_counter())))
+    if len(waits) < requests:
+        await done.wait()
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+
+    stats = shared.stats()
+    print(f"{uses:>5} {stats['generations']:>12} {stats['reused']:>7} "
+          f"{requests / stats['generations']:>10.2f} {elapsed:>8.2f} {sum(waits) / len(waits):>9.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests from {args.channels} channels, {args.workers} workers, "
+          f"{args.latency}s per generation")
+    print(f"{'uses':>5} {'generations':>12} {'reused':>7} {'games/gen':>10} {'wall s':>8} {'avg wait':>9}")
+    for uses in (1, 2, 3, 5):
+        await run(uses, args.requests, args.channels, args.latency, args.workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""Load test for the game web server
+
+Starts the server in-process on a free port, creates one game and has
+N concurrent players fetch its page and image over keep-alive
+connections. Prints requests/sec and latency percentiles.
+
+Before the players start, --idle clients load the page once and then
+leave their keep-alive connection open without sending anything, like
+players staring at the picture. They must not hold up the others; the
+idle connections are closed when the run ends.
+
+Usage: python benchmarks/load_test.py [--clients 200] [--requests 10] [--idle 64] [--workers 32] [--single]
+
+--single runs the same load against the stdlib single-threaded HTTPServer for comparison.
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import http.client
+from http.server import HTTPServer
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_server
+
+
+def run_player(port, game_id, requests_per_client, latencies, errors, start_event):
+    """Fetch the game page and image repeatedly over one connection"""
+    start_event.wait()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    paths = [f"/game/{game_id}", f"/images/{game_id}.png"]
+    for i in range(requests_per_client):
+        path = paths[i % len(paths)]
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            if response.getheader("Connection", "").lower() == "close" or response.version == 10:
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        except Exception as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def open_idle(port, game_id):
+    """Load the game page once and return the still-open keep-alive connection"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request("GET", f"/game/{game_id}")
+    conn.getresponse().read()
+    return conn
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--idle", type=int, default=64, help="idle keep-alive clients held open during the run")
+    parser.add_argument("--workers", type=int, default=web_server.WEB_WORKERS)
+    parser.add_argument("--single", action="store_true", help="use the stdlib single-threaded HTTPServer")
+    args = parser.parse_args()
+
+    if args.single:
+        # The original setup: one request at a time, one connection per request
+        class SingleRequestHandler(web_server.WhereIsBennyHandler):
+            protocol_version = "HTTP/1.0"
+
+        server = HTTPServer(("127.0.0.1", 0), SingleRequestHandler)
+        mode = "single-threaded HTTPServer"
+    else:
+        server = web_server.PooledHTTPServer(("127.0.0.1", 0), web_server.WhereIsBennyHandler, workers=args.workers)
+        mode = f"PooledHTTPServer, {args.workers} workers"
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    image = Image.effect_noise((1024, 1024), 64).convert("RGB")
+    game_id, _ = web_server.create_game(image, 100, 100, 40, 80, 0, 0, "loadtest", None)
+
+    idle = [open_idle(port, game_id) for _ in range(args.idle)]
+
+    latencies = []
+    errors = []
+    start_event = threading.Event()
+    threads = [threading.Thread(target=run_player, args=(port, game_id, args.requests, latencies, errors, start_event))
+               for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+
+    started = time.perf_counter()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for conn in idle:
+        conn.close()
+
+    web_server.remove_game(game_id)
+    server.shutdown()
+    server.server_close()
+
+    print(f"Mode:        {mode}")
+    print(f"Clients:     {args.clients} x {args.requests} requests, {args.idle} idle keep-alive")
+    print(f"Requests:    {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"Errors:      {len(errors)}")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"Latency p99: {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
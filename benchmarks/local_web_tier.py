@@ -0,0 +1,174 @@
+"""Local end-to-end check of the standalone multi-process web tier
+
+Plays the bot's part in-process (WEB_MODE=external): creates a game in a
+throwaway SQLite store, starts `web_server.py --processes N` as a separate
+service on a free port, then checks that every worker can serve the game,
+that a win travels back over the unix socket, that open game pages in
+every worker hear about it, and that a second finder gets a 404. No external services are needed; everything lives in a temp
+directory that is removed afterwards.
+
+Usage: python benchmarks/local_web_tier.py [--processes 2] [--requests 200]
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import shutil
+import tempfile
+import threading
+import subprocess
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fetch(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="benny-web-tier-")
+    port = free_port()
+    # The web_server module reads these at import, in this process and the service
+    os.environ.update({
+        "WEB_MODE": "external",
+        "GAME_STORAGE": "sqlite",
+        "GAME_DB_PATH": os.path.join(workdir, "games.db"),
+        "TEMP_DIR": os.path.join(workdir, "temp"),
+        "NOTIFY_SOCKET": os.path.join(workdir, "notify.sock"),
+        "PORT": str(port),
+    })
+
+    from PIL import Image
+    import web_server
+
+    wins = []
+    won = threading.Event()
+
+    def on_found(finder_name, discord_channel_id, creator_name):
+        wins.append((finder_name, discord_channel_id, creator_name))
+        won.set()
+
+    web_server.finder_callback = on_found
+    web_server.initialize()
+
+    game_id, game_url = web_server.create_game(
+        Image.new("RGB", (256, 256), "white"), 10, 10, 20, 20,
+        "1234", "42", "tester", on_found
+    )
+
+    service = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "web_server.py"), "--processes", str(args.processes)],
+        cwd=workdir
+    )
+    failures = []
+    try:
+        if not wait_for_port(port):
+            failures.append("web service did not start")
+            return 1
+
+        # Spread page and image requests over the workers
+        paths = [f"/game/{game_id}", f"/images/{game_id}.png", f"/images/{game_id}"] * (args.requests // 3)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            statuses = list(pool.map(lambda path: fetch(port, path), paths))
+        elapsed = time.perf_counter() - start
+        print(f"{len(paths)} requests in {elapsed:.2f}s ({len(paths) / elapsed:.0f} req/s)")
+        if any(status != 200 for status in statuses):
+            failures.append(f"unexpected statuses: {sorted(set(statuses))}")
+
+        # Open event streams; they land on different workers
+        streams = []
+        for _ in range(args.processes * 4):
+            sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+            sock.sendall(f"GET /events/{game_id} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            streams.append(sock)
+        time.sleep(0.5)
+
+        # A win needs the token from a verified click
+        if fetch(port, f"/found/{game_id}?user=mallory") != 403:
+            failures.append("/found without a verified click was accepted")
+        token = web_server.active_games[game_id]["win_token"]
+
+        # The first finder wins and the bot hears about it over IPC
+        if fetch(port, f"/found/{game_id}?user=alice&token={token}") != 200:
+            failures.append("first /found was not accepted")
+        if not won.wait(5):
+            failures.append("no win notification arrived")
+        elif wins[0] != ("alice", "1234", "tester"):
+            failures.append(f"wrong win notification: {wins[0]}")
+        if game_id in web_server.active_games:
+            failures.append("bot still has the found game")
+
+        # Every open page hears about the win, whichever worker it's on
+        for sock in streams:
+            received = b""
+            try:
+                while b"event: found" not in received:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    received += data
+            except OSError:
+                pass
+            sock.close()
+            if b"event: found" not in received:
+                failures.append("an open game page missed the win")
+                break
+
+        # Every worker must now refuse the game
+        for _ in range(args.processes * 2):
+            if fetch(port, f"/found/{game_id}?user=bob&token={token}") != 404:
+                failures.append("a second /found was accepted")
+                break
+        if len(wins) != 1:
+            failures.append(f"expected one win, got {len(wins)}")
+    finally:
+        service.terminate()
+        service.wait(10)
+        web_server.expiry_scheduler.stop()
+        if web_server.worker_listener:
+            web_server.worker_listener.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: games are shared, wins reach the bot and only the first finder wins")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import os
+import threading
+from PIL import Image
+
+# SDXL backgrounds are 1024x1024, so the pyramid is built for that height
+DEFAULT_BACKGROUND_HEIGHT = 1024
+
+
+def adjust_transparency(img, alpha_factor=0.85):
+    """Adjust the transparency of an image"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+
+    # Scale the alpha channel with a lookup table instead of touching each pixel in Python
+    alpha_lut = [min(255, int(i * alpha_factor)) for i in range(256)]
+    img.putalpha(img.getchannel('A').point(alpha_lut))
+    return img
+
+
+class SpriteCache:
+    """Decoded Benny sprite plus pre-resized, alpha-adjusted variants
+
+    The PNG is decoded once; variants are keyed by pixel height. A pyramid
+    covering min_percent..max_percent of the default background height is
+    built up front, other heights are added on first use. Everything is
+    reloaded when the file's mtime changes.
+    """
+
+    def __init__(self, path, alpha_factor=0.9, min_percent=0.03, max_percent=0.08,
+                 background_height=DEFAULT_BACKGROUND_HEIGHT):
+        self.path = path
+        self.alpha_factor = alpha_factor
+        self.min_percent = min_percent
+        self.max_percent = max_percent
+        self.background_height = background_height
+        self._sprite = None
+        self._mtime = None
+        # Format: {height: resized RGBA image}
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._variants)
+
+    def _check_fresh(self):
+        """Reload the sprite if the file changed on disk"""
+        mtime = os.path.getmtime(self.path)
+        if mtime != self._mtime:
+            with Image.open(self.path) as img:
+                self._sprite = img.convert('RGBA')
+            self._mtime = mtime
+            self._variants = {}
+            return True
+        return False
+
+    def _make_variant(self, height):
+        width = int((height / self._sprite.height) * self._sprite.width)
+        resized = self._sprite.resize((max(width, 1), height))
+        # Add slight transparency to help blend with the scene
+        return adjust_transparency(resized, alpha_factor=self.alpha_factor)
+
+    def load(self):
+        """Decode the sprite and build the pyramid of pre-scaled variants"""
+        with self._lock:
+            self._check_fresh()
+            min_height = max(int(self.background_height * self.min_percent), 1)
+            max_height = max(int(self.background_height * self.max_percent), min_height)
+            for height in range(min_height, max_height + 1):
+                if height not in self._variants:
+                    self._variants[height] = self._make_variant(height)
+
+    def get(self, height):
+        """Return the sprite scaled to height pixels (shared, don't modify it)"""
+        height = max(int(height), 1)
+        with self._lock:
+            self._check_fresh()
+            variant = self._variants.get(height)
+            if variant is None:
+                variant = self._variants[height] = self._make_variant(height)
+            return variant
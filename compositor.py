@@ -0,0 +1,298 @@
+import os
+import time
+import random
+import operator
+from itertools import accumulate
+from PIL import ImageFilter, ImageStat
+
+from image_pipeline import decode_image, encode_variants
+
+# How Benny's spot is picked (can be overridden from the .env file):
+#   "clutter" - favour busy parts of the scene where he blends in (default)
+#   "grid"    - a random spot in a random cell of a 3x3 grid
+PLACEMENT_MODE = os.getenv("PLACEMENT_MODE", "clutter").lower()
+# Longest side of the downsampled clutter map
+CLUTTER_MAP_SIZE = 128
+# Higher values favour the busiest regions more strongly
+CLUTTER_WEIGHT_POWER = 2
+# How far Benny's colours are pulled towards his surroundings, 0 (off) to 1
+BLEND_STRENGTH = float(os.getenv("BLEND_STRENGTH", "0.35"))
+# Limits on the per-channel gain, so a dark scene can't turn Benny black
+BLEND_MIN_GAIN = 0.6
+BLEND_MAX_GAIN = 1.5
+
+
+class Composite:
+    """A background with Benny hidden in it"""
+
+    def __init__(self, image, hitbox, timings, variants=None):
+        self.image = image
+        # Benny's box in image pixels: (x, y, width, height)
+        self.hitbox = hitbox
+        # Format: {step: seconds}
+        self.timings = timings
+        # Format: {format: bytes}, once encoded
+        self.variants = variants
+
+
+def grid_placement(background, sprite_size, rng=random, stats=None):
+    """Pick a random spot inside a random cell of a 3x3 grid
+
+    Returns Benny's top-left corner (x, y).
+    """
+    bg_width, bg_height = background.size
+    b_width, b_height = sprite_size
+
+    # Divide the image into a 3x3 grid and choose one of the 9 cells
+    grid_x = rng.randint(0, 2)
+    grid_y = rng.randint(0, 2)
+    cell_width = bg_width // 3
+    cell_height = bg_height // 3
+    cell_x_start = grid_x * cell_width
+    cell_y_start = grid_y * cell_height
+
+    # Place Benny randomly within the selected grid cell
+    x_max = min(cell_x_start + cell_width, bg_width) - b_width
+    y_max = min(cell_y_start + cell_height, bg_height) - b_height
+    x_pos = rng.randint(cell_x_start, max(cell_x_start, x_max))
+    y_pos = rng.randint(cell_y_start, max(cell_y_start, y_max))
+    return x_pos, y_pos
+
+
+def integral_image(data, width, height):
+    """Summed-area table of a width x height band, (width + 1) x (height + 1) flat list"""
+    integral = [0] * (width + 1)
+    above = integral
+    # One row at a time: running sum of the row plus the row above
+    for y in range(height):
+        row = [0]
+        row.extend(accumulate(data[y * width:(y + 1) * width]))
+        above = list(map(operator.add, above, row))
+        integral.extend(above)
+    return integral
+
+
+class RegionStats:
+    """Downsampled statistics of a background with O(1) region queries
+
+    The background is shrunk to at most CLUTTER_MAP_SIZE pixels on its
+    longest side once; integral images of its edge density and of each
+    colour channel are built from that on first use, so placement and
+    blending share the work and any rectangle can be summed in O(1).
+    Nothing is computed until it's first needed, so a compositor using
+    neither pays nothing; query it before pasting onto the background.
+    """
+
+    def __init__(self, background, size=CLUTTER_MAP_SIZE):
+        self.background = background
+        self.factor = max(1, max(background.size) // size)
+        # Same size Image.reduce() will produce
+        self.width = -(-background.width // self.factor)
+        self.height = -(-background.height // self.factor)
+        # Map pixels per background pixel
+        self.scale_x = self.width / background.width
+        self.scale_y = self.height / background.height
+        self._small = None
+        self._edges = None
+        self._channels = None
+
+    @property
+    def small(self):
+        """The downsampled background, in RGB"""
+        if self._small is None:
+            # Shrink before converting, so no full-size copy is made
+            background = self.background
+            small = background.reduce(self.factor) if self.factor > 1 else background
+            self._small = small if small is not background and small.mode == "RGB" else small.convert("RGB")
+        return self._small
+
+    @property
+    def edges(self):
+        """Integral image of edge strength"""
+        if self._edges is None:
+            edges = self.small.convert("L").filter(ImageFilter.FIND_EDGES)
+            self._edges = integral_image(edges.tobytes(), self.width, self.height)
+        return self._edges
+
+    @property
+    def channels(self):
+        """Integral images of the R, G and B channels"""
+        if self._channels is None:
+            self._channels = [integral_image(band.tobytes(), self.width, self.height)
+                              for band in self.small.split()]
+        return self._channels
+
+    def _sum(self, integral, x0, y0, x1, y1):
+        stride = self.width + 1
+        return (integral[y1 * stride + x1] - integral[y0 * stride + x1]
+                - integral[y1 * stride + x0] + integral[y0 * stride + x0])
+
+    def box_sums(self, box_width, box_height):
+        """Edge strength of every box_width x box_height window, row by row
+
+        Returns a flat list; entry y * (width - box_width + 1) + x is the
+        window with its top-left corner at map pixel (x, y).
+        """
+        integral, stride = self.edges, self.width + 1
+        columns = self.width - box_width + 1
+        sums = []
+        for y in range(self.height - box_height + 1):
+            top = y * stride
+            bottom = (y + box_height) * stride
+            # D - B - C + A for a whole row of windows at once
+            sums.extend(map(
+                operator.add,
+                map(operator.sub, integral[bottom + box_width:bottom + box_width + columns],
+                    integral[top + box_width:top + box_width + columns]),
+                map(operator.sub, integral[top:top + columns], integral[bottom:bottom + columns]),
+            ))
+        return sums
+
+    def mean_colour(self, box, margin=0.5):
+        """Average (R, G, B) around a box given in background pixels
+
+        The box (x, y, width, height) is grown by margin times its size on
+        each side, so the result describes the surroundings, not just the
+        pixels Benny is about to cover.
+        """
+        x_pos, y_pos, b_width, b_height = box
+        x0 = int((x_pos - b_width * margin) * self.scale_x)
+        y0 = int((y_pos - b_height * margin) * self.scale_y)
+        x1 = int((x_pos + b_width * (1 + margin)) * self.scale_x) + 1
+        y1 = int((y_pos + b_height * (1 + margin)) * self.scale_y) + 1
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, max(x1, x0 + 1)), min(self.height, max(y1, y0 + 1))
+        area = (x1 - x0) * (y1 - y0)
+        return tuple(self._sum(integral, x0, y0, x1, y1) / area for integral in self.channels)
+
+
+def clutter_placement(background, sprite_size, rng=random, stats=None):
+    """Pick a spot weighted by how busy the scene is there
+
+    Flat sky or empty ground rarely gets picked, so Benny ends up where
+    he blends in. Falls back to grid_placement for featureless images.
+    Returns Benny's top-left corner (x, y).
+    """
+    clutter = stats if stats is not None else RegionStats(background)
+    b_width, b_height = sprite_size
+    box_width = min(clutter.width, max(1, round(b_width * clutter.scale_x)))
+    box_height = min(clutter.height, max(1, round(b_height * clutter.scale_y)))
+
+    weights = [value ** CLUTTER_WEIGHT_POWER for value in clutter.box_sums(box_width, box_height)]
+    if not any(weights):
+        return grid_placement(background, sprite_size, rng)
+
+    columns = clutter.width - box_width + 1
+    index = rng.choices(range(len(weights)), weights=weights)[0]
+    map_y, map_x = divmod(index, columns)
+
+    # Back to background pixels, anywhere within the chosen map pixel
+    x_pos = int((map_x + rng.random()) / clutter.scale_x)
+    y_pos = int((map_y + rng.random()) / clutter.scale_y)
+    x_pos = max(0, min(x_pos, background.width - b_width))
+    y_pos = max(0, min(y_pos, background.height - b_height))
+    return x_pos, y_pos
+
+
+# Format: {mode: placement function}
+PLACEMENTS = {
+    "grid": grid_placement,
+    "clutter": clutter_placement,
+}
+
+
+def blend_sprite(sprite, surroundings, strength=BLEND_STRENGTH):
+    """Return a copy of sprite with its brightness and tint pulled towards surroundings
+
+    Each colour channel is scaled so Benny's average colour moves strength
+    of the way to the local average (R, G, B). Applied as one lookup table
+    per channel, so it runs in Pillow rather than per pixel in Python.
+    """
+    alpha = sprite.getchannel("A")
+    sprite_mean = ImageStat.Stat(sprite.convert("RGB"), mask=alpha).mean
+    lut = []
+    for own, local in zip(sprite_mean, surroundings):
+        target = own + (local - own) * strength
+        gain = min(BLEND_MAX_GAIN, max(BLEND_MIN_GAIN, target / max(own, 1.0)))
+        lut.extend(min(255, int(value * gain + 0.5)) for value in range(256))
+    # Alpha is left alone
+    lut.extend(range(256))
+    return sprite.point(lut)
+
+
+class Compositor:
+    """Hides Benny in backgrounds; shared by the bot, batch jobs and offline tools
+
+    The background is pasted onto in place, so a freshly decoded image
+    goes from decode to encode without a second full-frame buffer. Pass
+    owned=False for images the caller still needs untouched.
+
+    placement(background, sprite_size, rng, stats) picks Benny's top-left
+    corner; stats is the background's RegionStats, shared with blending.
+    """
+
+    def __init__(self, sprites, min_percent=0.03, max_percent=0.08, placement=None, rng=None,
+                 blend_strength=BLEND_STRENGTH):
+        # benny_sprite.SpriteCache (or anything with get(height))
+        self.sprites = sprites
+        self.min_percent = min_percent
+        self.max_percent = max_percent
+        if placement is None:
+            placement = PLACEMENTS.get(PLACEMENT_MODE, clutter_placement)
+        self.placement = placement
+        self.rng = rng or random.Random()
+        self.blend_strength = blend_strength
+
+    def pick_sprite(self, background_size):
+        """Return Benny scaled to a random 3-8% of the background height
+
+        Proportional to the scene: smaller in landscapes with many tiny
+        people, larger in closer-up scenes. The sprite is shared, so paste
+        it, don't modify it.
+        """
+        bg_height = background_size[1]
+        min_height = max(int(bg_height * self.min_percent), 1)
+        max_height = max(int(bg_height * self.max_percent), min_height)
+        return self.sprites.get(self.rng.randint(min_height, max_height))
+
+    def compose(self, background, owned=True):
+        """Hide Benny in a background and return a Composite"""
+        timings = {}
+        started = time.perf_counter()
+
+        if not owned:
+            background = background.copy()
+        if background.mode not in ("RGB", "RGBA"):
+            background = background.convert("RGB")
+
+        sprite = self.pick_sprite(background.size)
+        stats = RegionStats(background)
+        x_pos, y_pos = self.placement(background, sprite.size, self.rng, stats)
+        placed = time.perf_counter()
+        timings["place"] = placed - started
+
+        if self.blend_strength > 0:
+            surroundings = stats.mean_colour((x_pos, y_pos, sprite.width, sprite.height))
+            sprite = blend_sprite(sprite, surroundings, self.blend_strength)
+        blended = time.perf_counter()
+        timings["blend"] = blended - placed
+
+        # Paste straight onto the background buffer, using Benny's alpha as the mask
+        background.paste(sprite, (x_pos, y_pos), sprite)
+        timings["paste"] = time.perf_counter() - blended
+
+        return Composite(background, (x_pos, y_pos, sprite.width, sprite.height), timings)
+
+    def compose_bytes(self, image_bytes, formats=None):
+        """Decode a background, hide Benny in it and encode the variants"""
+        started = time.perf_counter()
+        background = decode_image(image_bytes)
+        decoded = time.perf_counter()
+
+        composite = self.compose(background)
+        composite.timings["decode"] = decoded - started
+
+        encode_started = time.perf_counter()
+        composite.variants = encode_variants(composite.image, formats)
+        composite.timings["encode"] = time.perf_counter() - encode_started
+        return composite
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import socket
+import selectors
+import threading
+from collections import deque
+
+# Comment line sent to idle streams so proxies and browsers keep them open
+# (can be overridden from the .env file)
+SSE_HEARTBEAT = float(os.environ.get("SSE_HEARTBEAT", "15"))
+# Most event streams held open at once; more are refused with 503
+SSE_MAX_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", "5000"))
+# How long a game's final event is kept for streams that connect just too late
+ENDED_GAME_TTL = 60
+
+
+def format_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class EventHub:
+    """Pushes game events to open Server-Sent Event streams
+
+    Handler threads reserve() a slot before writing the stream headers and
+    then hand the socket over with subscribe(), so no thread is tied up per
+    open page. One hub thread
+    owns every stream: it watches them with a selector to notice players
+    leaving, sends heartbeats, and fans each published event out with
+    non-blocking sends. Events are tiny, so a client that can't take one
+    right away is just dropped (its browser reconnects).
+    """
+
+    def __init__(self, heartbeat=SSE_HEARTBEAT, max_clients=SSE_MAX_CLIENTS, on_tick=None):
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        # Called from the hub thread about once a second while streams are open
+        self.on_tick = on_tick
+        self._selector = selectors.DefaultSelector()
+        # Format: {game_id: {socket, ...}}
+        self._streams = {}
+        # Format: {game_id: (final event bytes, time)} for games that just ended
+        self._ended = {}
+        # Work handed over by other threads, done by the hub thread in order
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._clients = 0
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self._selector.register(self._wake_recv, selectors.EVENT_READ)
+        self._thread = None
+        self._running = False
+        self.events_sent = 0
+
+    def start(self):
+        """Start the hub thread"""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="event-hub")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Close every stream and stop the hub thread"""
+        self._running = False
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _wake(self):
+        try:
+            self._wake_send.send(b"\0")
+        except (BlockingIOError, OSError):
+            # Already woken (or shutting down)
+            pass
+
+    def reserve(self):
+        """Claim a slot for a new stream; returns False if the hub is full"""
+        with self._lock:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def release(self):
+        """Give back a reserved slot that won't be subscribed after all"""
+        with self._lock:
+            self._clients -= 1
+
+    def subscribe(self, game_id, sock):
+        """Take over an open stream socket, using a slot claimed with reserve()"""
+        with self._lock:
+            self._pending.append(("subscribe", game_id, sock))
+        self._wake()
+
+    def publish(self, game_id, event, data, final=False):
+        """Send an event to every stream of a game; final events also close them
+
+        Dropped when the hub isn't running (e.g. in the bot process with an
+        external web tier), since nothing would ever take it off the queue.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            self._pending.append(("publish", game_id, (format_event(event, data), final)))
+        self._wake()
+
+    def subscribed_games(self):
+        """Return the IDs of games with open streams (hub thread only)"""
+        return list(self._streams)
+
+    def stats(self):
+        with self._lock:
+            return {"clients": self._clients, "games": len(self._streams), "events_sent": self.events_sent}
+
+    def _close(self, game_id, sock):
+        streams = self._streams.get(game_id)
+        if streams is not None:
+            streams.discard(sock)
+            if not streams:
+                del self._streams[game_id]
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+        with self._lock:
+            self._clients -= 1
+
+    def _send(self, game_id, sock, payload):
+        """Send without blocking; drop the stream if it can't take the whole payload"""
+        try:
+            if sock.send(payload) == len(payload):
+                return True
+        except OSError:
+            pass
+        self._close(game_id, sock)
+        return False
+
+    def _handle_pending(self):
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+
+        for action, game_id, value in pending:
+            if action == "subscribe":
+                sock = value
+                sock.setblocking(False)
+                ended = self._ended.get(game_id)
+                if ended is not None:
+                    # The game ended before the stream got here
+                    self._streams.setdefault(game_id, set()).add(sock)
+                    if self._send(game_id, sock, ended[0]):
+                        self._close(game_id, sock)
+                    continue
+                self._streams.setdefault(game_id, set()).add(sock)
+                self._selector.register(sock, selectors.EVENT_READ, game_id)
+            else:
+                payload, final = value
+                for sock in list(self._streams.get(game_id, ())):
+                    if self._send(game_id, sock, payload):
+                        self.events_sent += 1
+                        if final:
+                            self._close(game_id, sock)
+                if final:
+                    self._ended[game_id] = (payload, time.time())
+
+    def _run(self):
+        last_heartbeat = last_tick = time.time()
+        while self._running:
+            for key, events in self._selector.select(timeout=1):
+                if key.fileobj is self._wake_recv:
+                    try:
+                        while self._wake_recv.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                # A stream only becomes readable when the player leaves (or sends junk)
+                try:
+                    data = key.fileobj.recv(4096)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if not data:
+                    self._close(key.data, key.fileobj)
+
+            self._handle_pending()
+
+            now = time.time()
+            if now - last_heartbeat >= self.heartbeat:
+                last_heartbeat = now
+                for game_id, streams in list(self._streams.items()):
+                    for sock in list(streams):
+                        self._send(game_id, sock, b": ping\n\n")
+                # Forget ended games nobody can still be connecting to
+                for game_id, (payload, ended_at) in list(self._ended.items()):
+                    if now - ended_at > ENDED_GAME_TTL:
+                        del self._ended[game_id]
+
+            if self.on_tick is not None and self._streams and now - last_tick >= 1:
+                last_tick = now
+                try:
+                    self.on_tick()
+                except Exception as e:
+                    print(f"Error in event hub tick: {e}")
+
+        # Shutting down: close every stream
+        self._handle_pending()
+        for game_id, streams in list(self._streams.items()):
+            for sock in list(streams):
+                self._close(game_id, sock)
@@ -0,0 +1,97 @@
+import time
+import threading
+
+
+class ExpiryScheduler:
+    """Expires games at their expiry_time instead of polling
+
+    A single thread sleeps until the registry's earliest expiry, removes
+    every game that is due in one batch and hands the batch to on_expired.
+    Call wake() whenever a game is added so an earlier expiry is noticed.
+    """
+
+    def __init__(self, registry, on_expired):
+        self.registry = registry
+        # Called with a list of (game_id, game) that were just removed
+        self.on_expired = on_expired
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+        self.expired_games = 0
+        self.batches = 0
+        self.last_lag = None
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="expiry-scheduler")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self):
+        """Re-check the next expiry (call after adding a game)"""
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                next_expiry = self.registry.next_expiry()
+                delay = None if next_expiry is None else next_expiry - time.time()
+                if delay is None or delay >= 0:
+                    # Sleep until the next game is due or a new game is added
+                    self._wakeup.wait(None if delay is None else delay + 0.001)
+                    continue
+
+            try:
+                self.expire_due()
+            except Exception as e:
+                print(f"Error expiring games: {e}")
+
+    def expire_due(self, now=None):
+        """Remove every game that is due and return how many were expired"""
+        now = time.time() if now is None else now
+        batch = []
+        for game_id in self.registry.pop_expired(now):
+            # Only expire games nobody else removed in the meantime
+            game = self.registry.remove(game_id)
+            if game is not None:
+                batch.append((game_id, game))
+
+        if not batch:
+            return 0
+
+        for _, game in batch:
+            lag = now - game["expiry_time"]
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+        self.expired_games += len(batch)
+        self.batches += 1
+
+        self.on_expired(batch)
+        return len(batch)
+
+    def stats(self):
+        """Return scheduling lag statistics, in seconds"""
+        return {
+            "expired_games": self.expired_games,
+            "batches": self.batches,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": self.total_lag / self.expired_games if self.expired_games else None,
+        }
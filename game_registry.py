@@ -0,0 +1,163 @@
+import heapq
+import time
+import threading
+
+
+class GameRegistry:
+    """Active games with creator and channel indexes and an expiry heap
+
+    Behaves like the old {game_id: game} dict for lookups and iteration,
+    but finding a user's game is O(1) and pruning expired games only
+    touches games that are actually due.
+
+    Safe to share between the bot's event loop, handler threads and the
+    cleanup thread. Every change holds one short-lived lock, iteration
+    works on a snapshot, and claim() makes sure only one caller gets to
+    end a game.
+    """
+
+    def __init__(self):
+        # Format: {game_id: game}
+        self._games = {}
+        # Format: {str(creator_user_id): {game_id, ...}}
+        self._by_creator = {}
+        # Format: {str(discord_channel_id): {game_id, ...}}
+        self._by_channel = {}
+        # Heap of (expiry_time, game_id); stale entries are skipped when popped
+        self._expiry_heap = []
+        self._lock = threading.RLock()
+
+    def __contains__(self, game_id):
+        return game_id in self._games
+
+    def __getitem__(self, game_id):
+        return self._games[game_id]
+
+    def __len__(self):
+        return len(self._games)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, game_id, default=None):
+        return self._games.get(game_id, default)
+
+    def keys(self):
+        """Snapshot of the registered game IDs"""
+        with self._lock:
+            return list(self._games)
+
+    def items(self):
+        """Snapshot of (game_id, game) pairs, safe to iterate while games change"""
+        with self._lock:
+            return list(self._games.items())
+
+    def values(self):
+        """Snapshot of the registered games"""
+        with self._lock:
+            return list(self._games.values())
+
+    @staticmethod
+    def _index_add(index, key, game_id):
+        index.setdefault(str(key), set()).add(game_id)
+
+    @staticmethod
+    def _index_remove(index, key, game_id):
+        game_ids = index.get(str(key))
+        if game_ids is not None:
+            game_ids.discard(game_id)
+            if not game_ids:
+                del index[str(key)]
+
+    def add(self, game_id, game):
+        """Register a game"""
+        with self._lock:
+            if game_id in self._games:
+                self.remove(game_id)
+            self._games[game_id] = game
+            self._index_add(self._by_creator, game["creator_user_id"], game_id)
+            self._index_add(self._by_channel, game["discord_channel_id"], game_id)
+            heapq.heappush(self._expiry_heap, (game["expiry_time"], game_id))
+
+    def __setitem__(self, game_id, game):
+        self.add(game_id, game)
+
+    def remove(self, game_id):
+        """Unregister a game and return it, or None if it wasn't registered
+
+        Only one caller ever gets the game back, so only that caller
+        should release its resources.
+        """
+        with self._lock:
+            game = self._games.pop(game_id, None)
+            if game is not None:
+                self._index_remove(self._by_creator, game["creator_user_id"], game_id)
+                self._index_remove(self._by_channel, game["discord_channel_id"], game_id)
+                # The heap entry is left behind and skipped when it comes up
+            return game
+
+    def __delitem__(self, game_id):
+        if self.remove(game_id) is None:
+            raise KeyError(game_id)
+
+    def claim(self, game_id, now=None):
+        """Atomically end an unexpired game and return it
+
+        Returns None if the game doesn't exist, has expired, or another
+        caller already claimed it. Used so only one player can win.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            game = self._games.get(game_id)
+            if game is None or game["expiry_time"] <= now:
+                return None
+            return self.remove(game_id)
+
+    def find_by_creator(self, creator_user_id, now=None):
+        """Return the ID of an unexpired game created by this user, or None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for game_id in self._by_creator.get(str(creator_user_id), ()):
+                if self._games[game_id]["expiry_time"] > now:
+                    return game_id
+        return None
+
+    def games_in_channel(self, discord_channel_id):
+        """Return the IDs of the games posted in a channel"""
+        with self._lock:
+            return list(self._by_channel.get(str(discord_channel_id), ()))
+
+    def next_expiry(self):
+        """Return the earliest expiry time of a registered game, or None"""
+        with self._lock:
+            while self._expiry_heap:
+                expiry_time, game_id = self._expiry_heap[0]
+                game = self._games.get(game_id)
+                if game is not None and game["expiry_time"] == expiry_time:
+                    return expiry_time
+                heapq.heappop(self._expiry_heap)
+                if game is not None:
+                    # The game's expiry changed in place; requeue it at its new time
+                    heapq.heappush(self._expiry_heap, (game["expiry_time"], game_id))
+        return None
+
+    def pop_expired(self, now=None):
+        """Return the IDs of games whose expiry time has passed
+
+        Only heap entries that are due are looked at. Their heap entries
+        are consumed, so the caller is expected to remove the games.
+        """
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expiry_time, game_id = heapq.heappop(self._expiry_heap)
+                game = self._games.get(game_id)
+                if game is None:
+                    continue
+                if game["expiry_time"] < now:
+                    due.append(game_id)
+                elif game["expiry_time"] != expiry_time:
+                    # The game was extended in place; requeue it at its new time
+                    heapq.heappush(self._expiry_heap, (game["expiry_time"], game_id))
+        return due
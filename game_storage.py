@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Storage backend: "memory" (default, nothing survives a restart) or "sqlite"
+GAME_STORAGE = os.environ.get("GAME_STORAGE", "memory").lower()
+# SQLite database file used by the "sqlite" backend
+GAME_DB_PATH = os.environ.get("GAME_DB_PATH", os.path.join(os.path.dirname(__file__), "games.db"))
+
+# Game fields that can't be stored (they are re-attached or rebuilt after recovery)
+UNSTORED_FIELDS = ("finder_callback", "pages")
+
+
+class MemoryStorage:
+    """Default storage: keeps nothing beyond the in-process state
+
+    Games already live in web_server.active_games and rate limits in
+    the bot's RateLimits, so there is nothing to recover after a restart.
+    """
+
+    persistent = False
+
+    def save_game(self, game_id, game):
+        pass
+
+    def delete_games(self, game_ids):
+        pass
+
+    def delete_game(self, game_id):
+        self.delete_games([game_id])
+
+    def delete_expired(self, now=None):
+        return 0
+
+    def load_live_games(self, now=None):
+        """Return {game_id: game} for games that haven't expired"""
+        return {}
+
+    def load_game(self, game_id, now=None):
+        """Return a live game, or None"""
+        return None
+
+    def claim_game(self, game_id, now=None):
+        """Atomically end a live game; only one caller across processes gets True
+
+        In memory the registry's own claim is already atomic.
+        """
+        return True
+
+    def set_rate_limit(self, key, tokens, updated):
+        """Save one rate-limit bucket: tokens left as of the updated timestamp"""
+        pass
+
+    def load_rate_limits(self, since=0):
+        """Return [(key, tokens, updated)] for buckets updated after since"""
+        return []
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage(MemoryStorage):
+    """SQLite storage in WAL mode so games and rate limits survive restarts
+
+    One connection is shared by all threads behind a lock; WAL keeps
+    readers in other processes from blocking writes. Statements use
+    parameters so sqlite3 reuses its prepared statements, expiry lookups
+    hit an index, and batches of deletes share one transaction.
+    """
+
+    persistent = True
+
+    def __init__(self, path=GAME_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS games (
+                    game_id TEXT PRIMARY KEY,
+                    expiry_time REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS games_expiry_time ON games (expiry_time);
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+            """)
+            self._conn.commit()
+
+    def save_game(self, game_id, game):
+        data = {key: value for key, value in game.items() if key not in UNSTORED_FIELDS}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO games (game_id, expiry_time, data) VALUES (?, ?, ?)",
+                (game_id, game["expiry_time"], json.dumps(data))
+            )
+
+    def delete_games(self, game_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM games WHERE game_id = ?", [(game_id,) for game_id in game_ids])
+
+    def delete_expired(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM games WHERE expiry_time <= ?", (now,)).rowcount
+
+    def load_live_games(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute("SELECT game_id, data FROM games WHERE expiry_time > ?", (now,)).fetchall()
+        return {game_id: json.loads(data) for game_id, data in rows}
+
+    def load_game(self, game_id, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM games WHERE game_id = ? AND expiry_time > ?", (game_id, now)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim_game(self, game_id, now=None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            # The DELETE is atomic across processes, so only one claim removes the row
+            return self._conn.execute(
+                "DELETE FROM games WHERE game_id = ? AND expiry_time > ?", (game_id, now)
+            ).rowcount == 1
+
+    def set_rate_limit(self, key, tokens, updated):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, updated)
+            )
+
+    def load_rate_limits(self, since=0):
+        with self._lock, self._conn:
+            # Buckets idle that long are full again, so drop them while we're here
+            self._conn.execute("DELETE FROM rate_limits WHERE updated <= ?", (since,))
+            return self._conn.execute("SELECT key, tokens, updated FROM rate_limits").fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_storage(backend=GAME_STORAGE, path=GAME_DB_PATH):
+    """Create the storage backend named by GAME_STORAGE"""
+    if backend == "sqlite":
+        return SQLiteStorage(path)
+    if backend != "memory":
+        print(f"Unknown GAME_STORAGE '{backend}', using memory storage")
+    return MemoryStorage()
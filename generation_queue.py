@@ -0,0 +1,161 @@
+import os
+import asyncio
+from collections import OrderedDict, deque
+
+# Queue settings (can be overridden from the .env file)
+# Number of images generated at the same time
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "2"))
+# Maximum number of jobs waiting across every guild
+MAX_PENDING_JOBS = int(os.getenv("GENERATION_QUEUE_SIZE", "20"))
+# Maximum number of jobs waiting for a single guild
+MAX_PENDING_PER_GUILD = int(os.getenv("GENERATION_QUEUE_PER_GUILD", "5"))
+
+
+class QueueFull(Exception):
+    """Raised when a job is rejected because the queue is at capacity"""
+
+
+class GenerationJob:
+    """A queued image generation request"""
+
+    def __init__(self, guild_id, user_id, run, on_position=None):
+        self.guild_id = guild_id
+        self.user_id = user_id
+        # Coroutine function that does the actual work
+        self.run = run
+        # Optional coroutine function called with the job's new queue position
+        self.on_position = on_position
+        self.position = None
+
+
+class GenerationQueue:
+    """Bounded job queue with a worker pool and per-guild fairness
+
+    Each guild gets its own FIFO; workers take jobs from the guilds in
+    round-robin order so one busy server can't starve the others.
+    """
+
+    def __init__(self, workers=GENERATION_WORKERS, max_pending=MAX_PENDING_JOBS,
+                 max_per_guild=MAX_PENDING_PER_GUILD):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_per_guild = max_per_guild
+        # Format: {guild_id: deque([job, ...])}, in round-robin order
+        self._guilds = OrderedDict()
+        self._pending = 0
+        self._running = set()
+        self._worker_tasks = []
+        self._wakeup = None
+
+    def __len__(self):
+        return self._pending
+
+    @property
+    def running(self):
+        """Number of jobs currently being generated"""
+        return len(self._running)
+
+    def start(self):
+        """Start the worker pool (safe to call more than once)"""
+        if self._worker_tasks:
+            return
+        self._wakeup = asyncio.Condition()
+        for i in range(self.workers):
+            self._worker_tasks.append(asyncio.create_task(self._worker(i)))
+
+    async def stop(self):
+        """Cancel the worker pool"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def has_pending(self, user_id):
+        """Check if a user already has a job waiting or running"""
+        user_id = str(user_id)
+        if any(str(job.user_id) == user_id for job in self._running):
+            return True
+        return any(str(job.user_id) == user_id for jobs in self._guilds.values() for job in jobs)
+
+    async def submit(self, job):
+        """Queue a job and return its position (0 means it starts right away)
+
+        Raises QueueFull when the global or per-guild limit is reached.
+        """
+        self.start()
+
+        if self._pending >= self.max_pending:
+            raise QueueFull("The generation queue is full")
+        jobs = self._guilds.get(job.guild_id)
+        if jobs is not None and len(jobs) >= self.max_per_guild:
+            raise QueueFull("This server has too many games waiting")
+
+        if jobs is None:
+            jobs = self._guilds[job.guild_id] = deque()
+        jobs.append(job)
+        self._pending += 1
+
+        job.position = self._positions().get(job, 0)
+        # Round-robin can put the new job ahead of others, which move back a place
+        await self._notify_positions()
+
+        async with self._wakeup:
+            self._wakeup.notify()
+
+        return job.position
+
+    def _dispatch_order(self):
+        """Return waiting jobs in the order the workers will run them"""
+        order = []
+        queues = [list(jobs) for jobs in self._guilds.values()]
+        depth = max((len(jobs) for jobs in queues), default=0)
+        for i in range(depth):
+            for jobs in queues:
+                if i < len(jobs):
+                    order.append(jobs[i])
+        return order
+
+    def _positions(self):
+        """Map each waiting job to its 1-based position behind the busy workers"""
+        free_workers = max(self.workers - len(self._running), 0)
+        return {job: max(i + 1 - free_workers, 0) for i, job in enumerate(self._dispatch_order())}
+
+    def _next_job(self):
+        """Pop the next job, rotating through guilds for fairness"""
+        guild_id, jobs = next(iter(self._guilds.items()))
+        job = jobs.popleft()
+        if jobs:
+            # Move this guild to the back of the line
+            self._guilds.move_to_end(guild_id)
+        else:
+            del self._guilds[guild_id]
+        self._pending -= 1
+        return job
+
+    async def _notify_positions(self):
+        """Tell waiting jobs about their new position in the queue"""
+        for job, position in self._positions().items():
+            if position != job.position:
+                job.position = position
+                if job.on_position and position:
+                    try:
+                        await job.on_position(position)
+                    except Exception as e:
+                        print(f"Error updating queue position: {e}")
+
+    async def _worker(self, worker_id):
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: self._pending > 0)
+                job = self._next_job()
+
+            self._running.add(job)
+            await self._notify_positions()
+            try:
+                await job.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in generation worker {worker_id}: {e}")
+            finally:
+                self._running.discard(job)
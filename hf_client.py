@@ -0,0 +1,102 @@
+import os
+import asyncio
+import aiohttp
+
+# Hugging Face API endpoint for image generation (can be overridden from the .env
+# file, e.g. to point at a fake inference server for load tests)
+HUGGINGFACE_API_URL = os.getenv("HF_API_URL", "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0")
+
+# Client settings (can be overridden from the .env file)
+# Total time allowed for a single inference request, in seconds
+REQUEST_TIMEOUT = float(os.getenv("HF_REQUEST_TIMEOUT", "120"))
+# Time allowed to open a connection to the API, in seconds
+CONNECT_TIMEOUT = float(os.getenv("HF_CONNECT_TIMEOUT", "10"))
+# Maximum number of pooled connections to the API
+POOL_SIZE = int(os.getenv("HF_POOL_SIZE", "4"))
+# How many times to retry while the model is loading (503 + estimated_time)
+MAX_LOADING_RETRIES = int(os.getenv("HF_MAX_LOADING_RETRIES", "12"))
+# Upper bound for a single backoff sleep, in seconds
+MAX_BACKOFF = float(os.getenv("HF_MAX_BACKOFF", "10"))
+
+
+class GenerationError(Exception):
+    """Raised when the image generation API returns an error"""
+
+    def __init__(self, status, text):
+        super().__init__(f"{status} - {text}")
+        self.status = status
+        self.text = text
+
+
+class HuggingFaceClient:
+    """Async client for the Hugging Face inference API with a pooled session
+
+    Requests never block the event loop: the HTTP call is awaited through
+    aiohttp and the "model is loading" backoff uses asyncio.sleep.
+    """
+
+    def __init__(self, api_url=HUGGINGFACE_API_URL, api_key=None,
+                 request_timeout=REQUEST_TIMEOUT, connect_timeout=CONNECT_TIMEOUT,
+                 pool_size=POOL_SIZE, max_loading_retries=MAX_LOADING_RETRIES,
+                 max_backoff=MAX_BACKOFF):
+        self.api_url = api_url
+        self.api_key = api_key if api_key is not None else os.getenv("HUGGINGFACE_API_KEY")
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout)
+        self.pool_size = pool_size
+        self.max_loading_retries = max_loading_retries
+        self.max_backoff = max_backoff
+        self._session = None
+
+    @property
+    def headers(self):
+        """Headers for Hugging Face API"""
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    async def _get_session(self):
+        """Create the pooled session lazily so it binds to the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def generate(self, payload, on_loading=None):
+        """Request an image and return its raw bytes
+
+        on_loading is an optional coroutine function called with the
+        estimated wait time each time the API reports the model is loading.
+        """
+        session = await self._get_session()
+
+        for attempt in range(self.max_loading_retries + 1):
+            async with session.post(self.api_url, json=payload) as response:
+                if response.status == 200:
+                    return await response.read()
+
+                text = await response.text()
+
+                # Check if the model is still loading
+                wait_time = None
+                if response.status == 503:
+                    try:
+                        wait_time = (await response.json(content_type=None)).get("estimated_time")
+                    except (ValueError, aiohttp.ContentTypeError, AttributeError):
+                        wait_time = None
+
+                if wait_time is None or attempt == self.max_loading_retries:
+                    raise GenerationError(response.status, text)
+
+            if on_loading:
+                await on_loading(wait_time)
+            await asyncio.sleep(min(wait_time, self.max_backoff))
+
+        raise GenerationError(503, "Model did not finish loading")
@@ -0,0 +1,284 @@
+import os
+import time
+import random
+import asyncio
+import argparse
+from PIL import Image, ImageDraw
+from aiohttp import web
+
+import hf_client
+from image_pipeline import encode_png
+
+# A generator backend is anything with
+#     async generate(payload, on_loading=None) -> image bytes
+#     async close()
+# hf_client.HuggingFaceClient is the real one; the others let the bot run and be
+# load-tested without an API key. The fake server can also run on its own, for
+# the bot to use through HF_API_URL: python image_generators.py --port 8765
+
+# Which backend generates backgrounds (can be overridden from the .env file):
+#   huggingface - the Hugging Face inference API (default)
+#   procedural  - draws a busy crowd scene locally, no network at all
+#   files       - hands out images from IMAGE_BACKEND_DIR
+#   fake        - the real client against an in-process fake of the API
+#                 (503 + estimated_time while loading, then a set latency)
+IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "huggingface").lower()
+# Directory of backgrounds for the "files" backend
+IMAGE_BACKEND_DIR = os.getenv("IMAGE_BACKEND_DIR", os.path.join(os.path.dirname(__file__), "backgrounds"))
+# Size of procedural scenes (SDXL's default)
+PROCEDURAL_SIZE = (1024, 1024)
+
+# Fake inference server settings (can be overridden from the .env file)
+# Seconds per image once the model is loaded
+FAKE_INFERENCE_LATENCY = float(os.getenv("FAKE_INFERENCE_LATENCY", "8"))
+# Seconds the model takes to load, answering 503 + estimated_time meanwhile
+FAKE_INFERENCE_LOADING = float(os.getenv("FAKE_INFERENCE_LOADING", "20"))
+# Images generated at the same time; further requests wait their turn
+FAKE_INFERENCE_CONCURRENCY = int(os.getenv("FAKE_INFERENCE_CONCURRENCY", "1"))
+# The model is unloaded after this many idle seconds (0 = never)
+FAKE_INFERENCE_UNLOAD_AFTER = float(os.getenv("FAKE_INFERENCE_UNLOAD_AFTER", "0"))
+
+# File types the "files" backend picks up
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def draw_scene(size=PROCEDURAL_SIZE, rng=random):
+    """Draw a cartoon crowd scene: sky, a row of buildings and hundreds of little people"""
+    width, height = size
+    scene = Image.new("RGB", size, tuple(rng.randint(120, 220) for _ in range(3)))
+    draw = ImageDraw.Draw(scene)
+
+    horizon = rng.randint(height // 5, height // 2)
+    draw.rectangle((0, horizon, width, height), fill=tuple(rng.randint(60, 180) for _ in range(3)))
+
+    # Buildings and stalls along the horizon
+    x_pos = 0
+    while x_pos < width:
+        b_width = rng.randint(width // 20, width // 6)
+        b_height = rng.randint(height // 12, height // 4)
+        draw.rectangle((x_pos, horizon - b_height, x_pos + b_width, horizon),
+                       fill=tuple(rng.randint(40, 230) for _ in range(3)), outline=(30, 30, 30))
+        x_pos += b_width + rng.randint(0, width // 30)
+
+    # The crowd, bigger towards the bottom of the picture
+    for _ in range(width * height // 1500):
+        y_pos = rng.randint(horizon, height)
+        person = max(4, int(height * 0.05 * (0.3 + 0.7 * (y_pos - horizon) / max(1, height - horizon))))
+        x_pos = rng.randint(0, width)
+        head = max(2, person // 4)
+        draw.rectangle((x_pos - person // 5, y_pos - person + head, x_pos + person // 5, y_pos),
+                       fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        draw.ellipse((x_pos - head // 2, y_pos - person, x_pos + head // 2, y_pos - person + head),
+                     fill=(rng.randint(150, 255), rng.randint(110, 200), rng.randint(80, 160)))
+    return scene
+
+
+class ProceduralGenerator:
+    """Draws a scene locally instead of calling an API; the prompt is ignored"""
+
+    def __init__(self, size=PROCEDURAL_SIZE, seed=None):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.generated = 0
+
+    def _render(self, seed):
+        return encode_png(draw_scene(self.size, random.Random(seed)))
+
+    async def generate(self, payload, on_loading=None):
+        """Return a freshly drawn scene as PNG bytes"""
+        self.generated += 1
+        # Drawing and PNG encoding take a moment, keep them off the event loop
+        return await asyncio.to_thread(self._render, self.rng.random())
+
+    async def close(self):
+        pass
+
+
+class FileGenerator:
+    """Hands out images from a directory in random order; the prompt is ignored"""
+
+    def __init__(self, directory=IMAGE_BACKEND_DIR):
+        self.directory = directory
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise ValueError(f"No images found in {directory}")
+        self._order = []
+
+    def _read(self, path):
+        with open(path, "rb") as image_file:
+            return image_file.read()
+
+    async def generate(self, payload, on_loading=None):
+        """Return the bytes of the next image, reshuffling once all have been used"""
+        if not self._order:
+            self._order = random.sample(self.paths, len(self.paths))
+        return await asyncio.to_thread(self._read, self._order.pop())
+
+    async def close(self):
+        pass
+
+
+class FakeInferenceServer:
+    """Local stand-in for the Hugging Face inference API
+
+    Any POST is treated as a generation request. Until the model has
+    "loaded" the answer is 503 with an estimated_time, like the real API
+    after a cold start; afterwards each request takes about `latency`
+    seconds, with at most `concurrency` being worked on at once. Images
+    are a few procedural scenes rendered at startup and handed out in turn.
+    """
+
+    def __init__(self, latency=FAKE_INFERENCE_LATENCY, loading_time=FAKE_INFERENCE_LOADING,
+                 concurrency=FAKE_INFERENCE_CONCURRENCY, unload_after=FAKE_INFERENCE_UNLOAD_AFTER,
+                 host="127.0.0.1", port=0, images=4, size=PROCEDURAL_SIZE):
+        self.latency = latency
+        self.loading_time = loading_time
+        self.concurrency = concurrency
+        self.unload_after = unload_after
+        self.host = host
+        self.port = port
+        self.image_count = images
+        self.size = size
+        self.images = []
+        self._runner = None
+        self._gpu = None
+        self.ready_at = None
+        self.last_request = None
+        self.requests = 0
+        self.loading_responses = 0
+        self.served = 0
+        self.max_waiting = 0
+        self._waiting = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    async def start(self):
+        """Render the images, start listening and begin "loading" the model"""
+        rng = random.Random(0)
+        self.images = await asyncio.to_thread(
+            lambda: [encode_png(draw_scene(self.size, rng)) for _ in range(self.image_count)])
+        self._gpu = asyncio.Semaphore(self.concurrency)
+
+        app = web.Application()
+        app.router.add_post("/{path:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+
+        self.ready_at = time.monotonic() + self.loading_time
+        self.last_request = time.monotonic()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request):
+        await request.read()
+        now = time.monotonic()
+        self.requests += 1
+
+        # Cold start after sitting idle, like the serverless API
+        if self.unload_after and now >= self.ready_at and now - self.last_request > self.unload_after:
+            self.ready_at = now + self.loading_time
+        self.last_request = now
+
+        if now < self.ready_at:
+            self.loading_responses += 1
+            return web.json_response({"error": "Model is currently loading",
+                                      "estimated_time": round(self.ready_at - now, 1)}, status=503)
+
+        self._waiting += 1
+        self.max_waiting = max(self.max_waiting, self._waiting)
+        try:
+            async with self._gpu:
+                await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+        finally:
+            self._waiting -= 1
+
+        image_bytes = self.images[self.served % len(self.images)]
+        self.served += 1
+        return web.Response(body=image_bytes, content_type="image/png")
+
+    def stats(self):
+        """Return request counts and the longest line of requests waiting for the "GPU" """
+        return {
+            "requests": self.requests,
+            "loading_responses": self.loading_responses,
+            "served": self.served,
+            "max_waiting": self.max_waiting,
+        }
+
+
+class FakeServerGenerator:
+    """The real HuggingFaceClient talking to an in-process FakeInferenceServer
+
+    The server is started on the first request, so it binds to the loop
+    that's running by then.
+    """
+
+    def __init__(self, **server_options):
+        self.server = FakeInferenceServer(**server_options)
+        self.client = None
+        self._lock = None
+
+    async def generate(self, payload, on_loading=None):
+        if self.client is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self.client is None:
+                    await self.server.start()
+                    print(f"Fake inference server listening on {self.server.url}")
+                    self.client = hf_client.HuggingFaceClient(self.server.url, api_key="fake")
+        return await self.client.generate(payload, on_loading=on_loading)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+        await self.server.stop()
+
+
+def create_generator(backend=None):
+    """Return the generator backend named by IMAGE_BACKEND (or backend)"""
+    backend = (backend or IMAGE_BACKEND).lower()
+    if backend == "huggingface":
+        return hf_client.HuggingFaceClient()
+    if backend == "procedural":
+        return ProceduralGenerator()
+    if backend == "files":
+        return FileGenerator()
+    if backend == "fake":
+        return FakeServerGenerator()
+    raise ValueError(f"Unknown image backend {backend!r} (expected huggingface, procedural, files or fake)")
+
+
+async def serve_fake(args):
+    server = FakeInferenceServer(latency=args.latency, loading_time=args.loading, concurrency=args.concurrency,
+                                 unload_after=args.unload_after, host=args.host, port=args.port)
+    await server.start()
+    print(f"Fake inference server listening on {server.url} (set HF_API_URL to this)")
+    try:
+        while True:
+            await asyncio.sleep(30)
+            print(f"Fake inference server: {server.stats()}")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the fake inference server on its own")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=FAKE_INFERENCE_LATENCY)
+    parser.add_argument("--loading", type=float, default=FAKE_INFERENCE_LOADING)
+    parser.add_argument("--concurrency", type=int, default=FAKE_INFERENCE_CONCURRENCY)
+    parser.add_argument("--unload-after", type=float, default=FAKE_INFERENCE_UNLOAD_AFTER)
+    try:
+        asyncio.run(serve_fake(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
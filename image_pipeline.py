@@ -0,0 +1,83 @@
+import os
+import io
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# Number of worker threads for decoding, compositing and encoding images
+# (can be overridden from the .env file). Pillow releases the GIL while it
+# decodes, resizes, pastes and encodes, so threads run these in parallel.
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Extra formats encoded next to the lossless PNG for every game image
+IMAGE_FORMATS = [fmt.strip() for fmt in os.getenv("IMAGE_FORMATS", "webp,jpeg").split(",") if fmt.strip()]
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+
+# Format: {format: (file extension, content type)}
+IMAGE_FORMAT_INFO = {
+    "png": ("png", "image/png"),
+    "webp": ("webp", "image/webp"),
+    "jpeg": ("jpg", "image/jpeg"),
+}
+
+
+class ImagePipeline:
+    """Runs blocking PIL work in a thread pool so the event loop stays free"""
+
+    def __init__(self, workers=IMAGE_WORKERS):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-pipeline")
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) in a worker thread and return its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads"""
+        self.executor.shutdown(wait=wait)
+
+
+def decode_image(image_bytes):
+    """Decode image bytes into a fully loaded PIL image"""
+    img = Image.open(io.BytesIO(image_bytes))
+    img.load()
+    return img
+
+
+def encode_png(image):
+    """Encode a PIL image as PNG bytes"""
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def encode_image(image, fmt):
+    """Encode a PIL image in one of the IMAGE_FORMAT_INFO formats"""
+    buffer = io.BytesIO()
+    if fmt == "png":
+        image.save(buffer, "PNG")
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif fmt == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    return buffer.getvalue()
+
+
+def encode_variants(image, formats=None):
+    """Encode a PIL image as PNG plus smaller lossy variants
+
+    Returns {format: bytes}; PNG is always included as the fallback.
+    """
+    variants = {"png": encode_png(image)}
+    for fmt in (IMAGE_FORMATS if formats is None else formats):
+        if fmt not in variants:
+            try:
+                variants[fmt] = encode_image(image, fmt)
+            except Exception as e:
+                print(f"Error encoding {fmt} image: {e}")
+    return variants
@@ -0,0 +1,136 @@
+import os
+import zlib
+import threading
+from collections import OrderedDict
+
+# Memory budget for encoded game images, in bytes (can be overridden from the .env file)
+# Set to 0 to keep every image on disk only
+IMAGE_MEMORY_BUDGET = int(os.environ.get("IMAGE_MEMORY_BUDGET", str(64 * 1024 * 1024)))
+
+
+def make_etag(data):
+    """Build a strong ETag from the image bytes"""
+    return f'"{len(data):x}-{zlib.crc32(data):08x}"'
+
+
+class ImageStore:
+    """Encoded game images kept in memory, spilling to disk over budget
+
+    Images are keyed by file name (e.g. "<game_id>.png"). Hot images are
+    served straight from memory; when the total size goes over max_bytes
+    the least recently served images are written to the directory and
+    dropped from memory. Safe to use from several handler threads.
+
+    With write_through, every image is also written to disk as soon as it
+    is stored, so it survives a restart.
+    """
+
+    def __init__(self, directory, max_bytes=IMAGE_MEMORY_BUDGET, write_through=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.write_through = write_through
+        # Format: {name: bytes}, least recently used first
+        self._memory = OrderedDict()
+        # Format: {name: etag} for every image in memory or spilled to disk
+        self._etags = {}
+        # Format: {name: bytes} for images being written to disk right now
+        self._spilling = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.spills = 0
+
+    def path(self, name):
+        """Return the on-disk path for an image"""
+        return os.path.join(self.directory, name)
+
+    def _write_file(self, name, data):
+        with open(self.path(name), "wb") as img_file:
+            img_file.write(data)
+
+    def _spill(self):
+        """Move least recently used images to disk until we're within budget"""
+        spilled = []
+        while self._memory_bytes > self.max_bytes and self._memory:
+            name, data = self._memory.popitem(last=False)
+            self._memory_bytes -= len(data)
+            self._spilling[name] = data
+            spilled.append((name, data))
+        return spilled
+
+    def put(self, name, data):
+        """Store an encoded image"""
+        data = bytes(data)
+        etag = make_etag(data)
+
+        if self.write_through or len(data) > self.max_bytes:
+            self._write_file(name, data)
+
+        if len(data) > self.max_bytes:
+            # Too big to ever fit in memory
+            with self._lock:
+                self._etags[name] = etag
+            return
+
+        with self._lock:
+            self._etags[name] = etag
+            self._memory[name] = data
+            self._memory_bytes += len(data)
+            spilled = self._spill()
+
+        # Write spilled images outside the lock so readers aren't blocked on disk I/O
+        for spilled_name, spilled_data in spilled:
+            try:
+                if not self.write_through:
+                    self._write_file(spilled_name, spilled_data)
+                self.spills += 1
+            except Exception as e:
+                print(f"Error spilling image to disk: {e}")
+            with self._lock:
+                self._spilling.pop(spilled_name, None)
+                removed = spilled_name not in self._etags
+            if removed:
+                # The game ended while we were writing its image
+                self.remove(spilled_name)
+
+    def get(self, name):
+        """Return (memoryview or None, etag) for an image
+
+        A None memoryview means the image lives on disk at path(name).
+        The etag is None if the store doesn't know about the image.
+        """
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                return memoryview(data), self._etags[name]
+            data = self._spilling.get(name)
+            if data is not None:
+                return memoryview(data), self._etags.get(name)
+            return None, self._etags.get(name)
+
+    def remove(self, name):
+        """Forget an image and delete its file if it was spilled"""
+        with self._lock:
+            data = self._memory.pop(name, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+            self._etags.pop(name, None)
+
+        if data is None or self.write_through:
+            image_path = self.path(name)
+            try:
+                if os.path.exists(image_path):
+                    os.remove(image_path)
+            except Exception as e:
+                print(f"Error removing game file: {e}")
+
+    def stats(self):
+        """Return memory usage statistics"""
+        with self._lock:
+            return {
+                "memory_bytes": self._memory_bytes,
+                "memory_budget": self.max_bytes,
+                "memory_images": len(self._memory),
+                "disk_images": len(self._etags) - len(self._memory),
+                "spills": self.spills,
+            }
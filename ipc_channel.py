@@ -0,0 +1,63 @@
+import os
+import json
+import socket
+import tempfile
+import threading
+
+# Unix datagram socket the bot listens on for events from standalone web workers
+NOTIFY_SOCKET = os.environ.get("NOTIFY_SOCKET", os.path.join(tempfile.gettempdir(), "wheresbenny.sock"))
+
+
+def send_notification(message, path=None):
+    """Send a JSON event to the bot process; returns False if it isn't listening"""
+    path = path or NOTIFY_SOCKET
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(json.dumps(message).encode(), path)
+        return True
+    except OSError as e:
+        print(f"Error sending notification to the bot: {e}")
+        return False
+
+
+class NotificationListener:
+    """Receives JSON events from web workers and passes them to a handler"""
+
+    def __init__(self, handler, path=None):
+        self.handler = handler
+        self.path = path or NOTIFY_SOCKET
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        """Bind the socket and start the listener thread"""
+        # Remove a socket file left behind by a previous run
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._thread = threading.Thread(target=self._run, name="notification-listener")
+        self._thread.daemon = True
+        self._thread.start()
+        print(f"Listening for web worker events on {self.path}")
+
+    def stop(self):
+        """Close the socket (the listener thread exits with it)"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _run(self):
+        sock = self._sock
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                # Socket was closed
+                return
+            try:
+                self.handler(json.loads(data))
+            except Exception as e:
+                print(f"Error handling web worker event: {e}")
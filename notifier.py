@@ -0,0 +1,156 @@
+import os
+import time
+import asyncio
+from collections import deque
+
+from rate_limiter import TokenBucket
+
+# Notification settings (can be overridden from the .env file)
+# Messages for the same channel within this many seconds are sent as one
+NOTIFY_BATCH_WINDOW = float(os.getenv("NOTIFY_BATCH_WINDOW", "0.5"))
+# Discord allows about 5 messages per 5 seconds per channel
+NOTIFY_CHANNEL_RATE = float(os.getenv("NOTIFY_CHANNEL_RATE", "1"))
+NOTIFY_CHANNEL_BURST = int(os.getenv("NOTIFY_CHANNEL_BURST", "5"))
+# ... and about 50 requests per second for the whole bot
+NOTIFY_GLOBAL_RATE = float(os.getenv("NOTIFY_GLOBAL_RATE", "40"))
+# Attempts per batch before it's dropped, and the longest wait between them
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "4"))
+NOTIFY_MAX_BACKOFF = float(os.getenv("NOTIFY_MAX_BACKOFF", "30"))
+
+# Discord's message length limit
+MAX_MESSAGE_LENGTH = 2000
+
+
+class ChannelNotifier:
+    """Outbound channel messages, coalesced per channel and rate limited
+
+    Messages for a channel are collected for a short window and sent as
+    one, split only where Discord's length limit requires. Each channel
+    has its own token bucket (Discord rate limits message sends per
+    channel) and all channels share a global one. Failed sends are retried
+    with exponential backoff, except for errors listed in no_retry.
+
+    notify() must run on the event loop; other threads hand messages over
+    with asyncio.run_coroutine_threadsafe(notifier.notify(...), loop).
+    """
+
+    def __init__(self, send, window=NOTIFY_BATCH_WINDOW, channel_rate=NOTIFY_CHANNEL_RATE,
+                 channel_burst=NOTIFY_CHANNEL_BURST, global_rate=NOTIFY_GLOBAL_RATE,
+                 max_attempts=NOTIFY_MAX_ATTEMPTS, max_backoff=NOTIFY_MAX_BACKOFF, no_retry=()):
+        # Coroutine function: send(channel_id, text)
+        self.send = send
+        self.window = window
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.no_retry = no_retry
+        self.global_bucket = TokenBucket(global_rate, max(1, int(global_rate)))
+        # Format: {channel_id: deque([(text, queued_at), ...])}
+        self._pending = {}
+        # Format: {channel_id: TokenBucket}
+        self._buckets = {}
+        # Format: {channel_id: task} for channels with a batch on the way
+        self._senders = {}
+        self.sent_messages = 0
+        self.sent_batches = 0
+        self.retries = 0
+        self.failures = 0
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+
+    def __len__(self):
+        """Number of messages waiting to be sent"""
+        return sum(len(messages) for messages in self._pending.values())
+
+    async def notify(self, channel_id, text):
+        """Queue a message for a channel"""
+        channel_id = str(channel_id)
+        self._pending.setdefault(channel_id, deque()).append((text, time.monotonic()))
+        if channel_id not in self._senders:
+            self._senders[channel_id] = asyncio.create_task(self._run_channel(channel_id))
+
+    def _take_batch(self, channel_id):
+        """Pop as many queued messages as fit in one Discord message"""
+        messages = self._pending[channel_id]
+        texts, queued = [], []
+        length = 0
+        while messages:
+            text, queued_at = messages[0]
+            text = text[:MAX_MESSAGE_LENGTH]
+            added = len(text) + (1 if texts else 0)
+            if texts and length + added > MAX_MESSAGE_LENGTH:
+                break
+            messages.popleft()
+            texts.append(text)
+            queued.append(queued_at)
+            length += added
+        return "\n".join(texts), queued
+
+    async def _run_channel(self, channel_id):
+        """Send a channel's queued messages in batches until none are left"""
+        try:
+            bucket = self._buckets.get(channel_id)
+            if bucket is None:
+                bucket = self._buckets[channel_id] = TokenBucket(self.channel_rate, self.channel_burst)
+
+            while self._pending.get(channel_id):
+                # Give more messages for this channel a moment to arrive
+                await asyncio.sleep(self.window)
+                text, queued = self._take_batch(channel_id)
+                await bucket.acquire()
+                await self.global_bucket.acquire()
+                if await self._send_with_retries(channel_id, text, bucket):
+                    now = time.monotonic()
+                    self.sent_batches += 1
+                    self.sent_messages += len(queued)
+                    for queued_at in queued:
+                        latency = now - queued_at
+                        self._latency_total += latency
+                        self.max_latency = max(self.max_latency, latency)
+                else:
+                    self.failures += len(queued)
+        finally:
+            # Nothing can be queued between the loop's last check and here (no await),
+            # so the next notify() for this channel starts a fresh sender
+            self._senders.pop(channel_id, None)
+            if not self._pending.get(channel_id):
+                self._pending.pop(channel_id, None)
+
+    async def _send_with_retries(self, channel_id, text, bucket):
+        """Send one batch, backing off between failed attempts; returns True if it went out"""
+        for attempt in range(self.max_attempts):
+            try:
+                await self.send(channel_id, text)
+                return True
+            except self.no_retry as e:
+                print(f"Dropping notification for channel {channel_id}: {e}")
+                return False
+            except Exception as e:
+                if attempt == self.max_attempts - 1:
+                    print(f"Giving up on notification for channel {channel_id}: {e}")
+                    return False
+                delay = min(self.max_backoff, 0.5 * 2 ** attempt)
+                print(f"Error sending notification to channel {channel_id}, retrying in {delay:.1f}s: {e}")
+                self.retries += 1
+                await asyncio.sleep(delay)
+                await bucket.acquire()
+        return False
+
+    async def close(self):
+        """Cancel pending sends"""
+        for task in list(self._senders.values()):
+            task.cancel()
+
+    def stats(self):
+        """Return queue depth and delivery statistics"""
+        return {
+            "queued": len(self),
+            "channels": len(self._senders),
+            "sent_messages": self.sent_messages,
+            "sent_batches": self.sent_batches,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_latency": self._latency_total / self.sent_messages if self.sent_messages else None,
+            "max_latency": self.max_latency,
+        }
@@ -0,0 +1,122 @@
+import os
+import re
+import gzip
+import html
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional; static assets are still served gzipped without it
+    brotli = None
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+# Assets are named by content hash in their URLs, so browsers can cache them for good
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+STATIC_CONTENT_TYPES = {
+    "css": "text/css; charset=utf-8",
+    "js": "application/javascript; charset=utf-8",
+}
+
+# {{name}} placeholders in templates
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def escape_value(value):
+    """HTML-escape a template value and encode it"""
+    if isinstance(value, str):
+        return html.escape(value).encode()
+    return str(value).encode()
+
+
+class PageTemplate:
+    """An HTML template compiled once into byte chunks and value slots
+
+    Rendering only escapes the values and joins the pre-encoded chunks,
+    instead of rebuilding the whole page with its CSS and JS on every hit.
+    Values that never change can be baked in ahead of time with bind().
+    """
+
+    def __init__(self, source):
+        parts = PLACEHOLDER.split(source)
+        # Even parts are literal text, odd parts are placeholder names
+        self._compile([part.encode() if i % 2 == 0 else part for i, part in enumerate(parts)])
+
+    def _compile(self, parts):
+        # Merge neighbouring literal chunks so render joins as few pieces as possible
+        chunks = []
+        for part in parts:
+            if isinstance(part, bytes) and chunks and isinstance(chunks[-1], bytes):
+                chunks[-1] += part
+            else:
+                chunks.append(part)
+        self._chunks = chunks
+        self._slots = [(i, name) for i, name in enumerate(chunks) if isinstance(name, str)]
+        self.names = {name for i, name in self._slots}
+
+    def bind(self, **values):
+        """Return a copy of the template with some values filled in for good"""
+        bound = PageTemplate.__new__(PageTemplate)
+        bound._compile([
+            escape_value(values[part]) if isinstance(part, str) and part in values else part
+            for part in self._chunks
+        ])
+        return bound
+
+    def render(self, **values):
+        """Return the page as UTF-8 bytes with every value HTML-escaped"""
+        chunks = self._chunks.copy()
+        for i, name in self._slots:
+            chunks[i] = escape_value(values[name])
+        return b"".join(chunks)
+
+
+def load_template(name, directory=TEMPLATE_DIR):
+    """Compile a template file"""
+    with open(os.path.join(directory, name), encoding="utf-8") as template_file:
+        return PageTemplate(template_file.read())
+
+
+class StaticAsset:
+    """A static file held in memory with pre-compressed variants"""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.content_type = STATIC_CONTENT_TYPES.get(name.rsplit(".", 1)[-1], "application/octet-stream")
+        self.version = f"{zlib.crc32(data):08x}"
+        self.etag = f'"{self.version}"'
+        # Format: {content encoding: bytes}; "identity" is the original
+        self.encodings = {"identity": data}
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            self.encodings["gzip"] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(data, quality=11)
+            if len(compressed) < len(data):
+                self.encodings["br"] = compressed
+
+    @property
+    def url(self):
+        """Versioned URL, so a changed file gets a new URL"""
+        return f"/static/{self.name}?v={self.version}"
+
+    def choose_encoding(self, accept_encoding):
+        """Return (encoding, bytes) for the smallest variant the client accepts"""
+        accepted = {token.split(";")[0].strip() for token in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encodings:
+                return encoding, self.encodings[encoding]
+        return "identity", self.encodings["identity"]
+
+
+def load_static_assets(directory=STATIC_DIR):
+    """Load every file in the static directory; returns {name: StaticAsset}"""
+    assets = {}
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if entry.is_file():
+            with open(entry.path, "rb") as asset_file:
+                assets[entry.name] = StaticAsset(entry.name, asset_file.read())
+    return assets
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to capacity tokens, refilled at rate per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def try_acquire(self, tokens=1, now=None):
+        """Take tokens if there are enough; returns False (taking nothing) otherwise"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens=1, now=None):
+        """Seconds until tokens will be available (0 if they are now)"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens=1):
+        """Wait until tokens are available and take them"""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.wait_time(tokens))
+
+
+class KeyedRateLimiter:
+    """One token bucket per key (user, channel, ...) with bounded memory
+
+    A bucket that has been idle long enough to refill completely is the
+    same as no bucket at all, so such entries are evicted lazily as new
+    keys come in. max_entries caps memory even under a flood of new keys
+    by dropping the least recently used buckets.
+    """
+
+    def __init__(self, rate, capacity, max_entries=100000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_entries = max_entries
+        # Seconds after which an idle bucket is full again
+        self.ttl = capacity / rate
+        # Format: {key: TokenBucket}, least recently used first
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _evict(self, now):
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if len(self._buckets) < self.max_entries and now - bucket.updated < self.ttl:
+                break
+            del self._buckets[key]
+
+    def bucket(self, key, now=None):
+        """Return the bucket for a key, creating a full one if needed"""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict(now)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            bucket.updated = now
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def wait_time(self, key, now=None):
+        """Seconds until key may act again (0 if it may now)"""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        return 0.0 if bucket is None else bucket.wait_time(1, now)
+
+    def restore(self, key, tokens, idle):
+        """Recreate a bucket from saved state: tokens left, seconds since it was used"""
+        bucket = self.bucket(key)
+        bucket.tokens = min(self.capacity, tokens)
+        bucket.updated = time.monotonic() - idle
+
+
+def parse_rate(value):
+    """Parse a "count/seconds" rate ("1/600" = once every 10 minutes); None if off"""
+    value = value.strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    count, seconds = value.split("/")
+    return int(count), float(seconds)
+
+
+# Rate limits for starting games (can be overridden from the .env file), as
+# "count/seconds" or "off". Each scope has its own token bucket, so a user can
+# start `count` games in a burst and then one every seconds/count. Only the
+# per-user limit is on by default; busy servers can add channel and guild caps.
+RATE_LIMIT_POLICY = {
+    "user": parse_rate(os.getenv("RATE_LIMIT_USER", "1/600")),
+    "channel": parse_rate(os.getenv("RATE_LIMIT_CHANNEL", "off")),
+    "guild": parse_rate(os.getenv("RATE_LIMIT_GUILD", "off")),
+}
+
+
+class RateLimits:
+    """Per-user, per-channel and per-guild limits checked together
+
+    A request only uses up a token if every scope allows it. With a
+    storage backend that persists, bucket state is saved on every change
+    and reloaded on startup.
+    """
+
+    def __init__(self, policy=None, storage=None):
+        policy = RATE_LIMIT_POLICY if policy is None else policy
+        # Format: {scope: KeyedRateLimiter}
+        self.limiters = {}
+        for scope, rate in policy.items():
+            if rate is not None:
+                count, seconds = rate
+                self.limiters[scope] = KeyedRateLimiter(count / seconds, count)
+        self.storage = storage if storage is not None and storage.persistent else None
+        self.limited = 0
+        if self.storage is not None:
+            self._load()
+
+    def _keys(self, user_id, channel_id, guild_id):
+        keys = {"user": user_id, "channel": channel_id, "guild": guild_id}
+        return [(scope, limiter, f"{scope}:{keys[scope]}")
+                for scope, limiter in self.limiters.items() if keys.get(scope) is not None]
+
+    def _load(self):
+        now = time.time()
+        max_ttl = max((limiter.ttl for limiter in self.limiters.values()), default=0)
+        for key, tokens, updated in self.storage.load_rate_limits(since=now - max_ttl):
+            scope = key.split(":", 1)[0]
+            limiter = self.limiters.get(scope)
+            if limiter is not None and now - updated < limiter.ttl:
+                limiter.restore(key, tokens, now - updated)
+
+    def _save(self, key, bucket):
+        wall_time = time.time() - (time.monotonic() - bucket.updated)
+        self.storage.set_rate_limit(key, bucket.tokens, wall_time)
+
+    def check(self, user_id, channel_id=None, guild_id=None):
+        """Use up one token in every scope, if they all have one
+
+        Returns (None, 0) when allowed, or (scope, seconds to wait) for the
+        scope that is out of tokens.
+        """
+        now = time.monotonic()
+        keys = self._keys(user_id, channel_id, guild_id)
+        for scope, limiter, key in keys:
+            wait = limiter.wait_time(key, now)
+            if wait > 0:
+                self.limited += 1
+                return scope, wait
+        for scope, limiter, key in keys:
+            bucket = limiter.bucket(key, now)
+            bucket.try_acquire(1, now)
+            if self.storage is not None:
+                self._save(key, bucket)
+        return None, 0
+
+    def refund(self, user_id, channel_id=None, guild_id=None):
+        """Give back the tokens of a request that didn't go ahead"""
+        for scope, limiter, key in self._keys(user_id, channel_id, guild_id):
+            bucket = limiter.bucket(key)
+            bucket.tokens = min(bucket.capacity, bucket.tokens + 1)
+            if self.storage is not None:
+                self._save(key, bucket)
+
+    def stats(self):
+        """Return tracked keys per scope and how many requests were limited"""
+        return {"tracked": {scope: len(limiter) for scope, limiter in self.limiters.items()}, "limited": self.limited}
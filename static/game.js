@@ -0,0 +1,172 @@
+// Game data is rendered into data- attributes by the server
+const gameData = document.body.dataset;
+
+// Handed out by the server when a click lands on Benny, required to claim the win
+let winToken = null;
+
+// Setup countdown timer
+let timeLeft = Number(gameData.timeLeft);
+const countdownEl = document.getElementById('countdown');
+const nameModal = document.getElementById('nameModal');
+
+// Set once the game has ended, from the server's events or our own countdown
+let gameOver = false;
+
+// Simple timer function
+function updateTimer() {
+    if (gameOver) return;
+    if (timeLeft <= 0) {
+        showGameOver("Time's up!", "Nobody found Benny this time.");
+        return;
+    }
+
+    const minutes = Math.floor(timeLeft / 60);
+    const seconds = timeLeft % 60;
+    countdownEl.textContent = `${minutes}:${seconds.toString().padStart(2, '0')}`;
+    timeLeft--;
+    setTimeout(updateTimer, 1000);
+}
+
+// Start the timer
+updateTimer();
+
+// Stop the game and tell the player why
+function showGameOver(title, text) {
+    if (gameOver) return;
+    gameOver = true;
+    nameModal.style.display = 'none';
+    document.getElementById('gameOverTitle').textContent = title;
+    document.getElementById('gameOverText').textContent = text;
+    document.getElementById('gameOverModal').style.display = 'flex';
+}
+
+// Live updates pushed by the server while the game is open
+function listenForGameEvents() {
+    if (!window.EventSource) return;
+    const events = new EventSource(`/events/${encodeURIComponent(gameData.gameId)}`);
+
+    // Sent on (re)connect to keep our countdown in step with the server
+    events.addEventListener('hello', function(event) {
+        timeLeft = JSON.parse(event.data).time_left;
+    });
+    events.addEventListener('found', function(event) {
+        const finder = JSON.parse(event.data).finder;
+        events.close();
+        showGameOver('Benny was found!', finder ? `${finder} found Benny first.` : 'Someone else found Benny first.');
+    });
+    events.addEventListener('expired', function() {
+        events.close();
+        showGameOver("Time's up!", 'Nobody found Benny this time.');
+    });
+}
+
+listenForGameEvents();
+
+// Fast mobile touch handling (no delay)
+function setupFastTouchHandling() {
+    const img = document.getElementById('gameImage');
+
+    if (!img) return;
+
+    // Only one click check in flight at a time
+    let checking = false;
+
+    // Ask the server whether a click at image pixel (x, y) is on Benny
+    function checkClick(x, y) {
+        if (checking || winToken || gameOver) return;
+        checking = true;
+        fetch(`/click/${encodeURIComponent(gameData.gameId)}`, {method: 'POST', body: `${x},${y}`})
+            .then(function(response) {
+                // Too many misses: the server ignores clicks for a while
+                if (response.status === 429) {
+                    showSlowDown(Number(response.headers.get('Retry-After')) || 1);
+                    return {hit: false};
+                }
+                return response.ok ? response.json() : {hit: false};
+            })
+            .then(function(result) {
+                if (result.hit) {
+                    winToken = result.token;
+                    foundBenny();
+                }
+            })
+            .catch(function() {})
+            .finally(function() { checking = false; });
+    }
+
+    // Handle click/tap events with maximum efficiency
+    function handleInteraction(event) {
+        // Get interaction coordinates
+        const rect = img.getBoundingClientRect();
+        let x, y;
+
+        // Touch event
+        if (event.touches && event.touches.length > 0) {
+            x = event.touches[0].clientX - rect.left;
+            y = event.touches[0].clientY - rect.top;
+            event.preventDefault(); // Prevent scrolling/zooming
+        }
+        // Mouse event
+        else {
+            x = event.clientX - rect.left;
+            y = event.clientY - rect.top;
+        }
+
+        // Convert from displayed size to image pixels
+        checkClick(Math.round(x * img.naturalWidth / rect.width), Math.round(y * img.naturalHeight / rect.height));
+    }
+
+    // Add all event listeners with the right flags for performance
+    img.addEventListener('click', handleInteraction, false);
+    img.addEventListener('touchstart', handleInteraction, {passive: false});
+}
+
+// Tell the player their clicks are being refused, counting down until they count again
+let slowDownTimer = null;
+function showSlowDown(seconds) {
+    const notice = document.getElementById('clickNotice');
+    clearTimeout(slowDownTimer);
+
+    function tick() {
+        if (seconds <= 0 || gameOver) {
+            notice.style.display = 'none';
+            return;
+        }
+        notice.textContent = `Slow down! Too many wrong clicks, try again in ${seconds}s.`;
+        notice.style.display = 'block';
+        seconds--;
+        slowDownTimer = setTimeout(tick, 1000);
+    }
+    tick();
+}
+
+// When Benny is found, show the name input modal
+function foundBenny() {
+    // Show modal immediately (better response time)
+    nameModal.style.display = 'flex';
+
+    // Focus the input field (slight delay to ensure modal is visible first)
+    setTimeout(function() {
+        document.getElementById('username-input').focus();
+    }, 10);
+
+    // Allow Enter key to submit
+    document.getElementById('username-input').addEventListener('keyup', function(event) {
+        if (event.key === 'Enter') {
+            submitName();
+        }
+    });
+}
+
+// Submit name and redirect
+function submitName() {
+    const name = document.getElementById('username-input').value || 'Anonymous';
+    window.location.href = `/found/${encodeURIComponent(gameData.gameId)}?user=${encodeURIComponent(name)}&token=${encodeURIComponent(winToken)}`;
+}
+
+// Initialize everything when page loads
+if (document.readyState === 'loading') {
+    window.addEventListener('DOMContentLoaded', setupFastTouchHandling);
+} else {
+    setupFastTouchHandling();
+}
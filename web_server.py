@@ -1,26 +1,57 @@
 import os
 import io
+import re
+import sys
 import json
 import time
 import uuid
+import hmac
+import signal
+import socket
+import secrets
+import selectors
+import argparse
+import functools
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 
+from image_store import ImageStore
+from game_registry import GameRegistry
+from expiry_scheduler import ExpiryScheduler
+from game_storage import create_storage
+from image_pipeline import IMAGE_FORMAT_INFO, encode_variants
+from ipc_channel import NotificationListener, send_notification
+from event_hub import EventHub, format_event
+from page_templates import STATIC_CACHE_CONTROL, load_template, load_static_assets
+from rate_limiter import KeyedRateLimiter
+
 # Directory for temporary image files
-TEMP_DIR = os.path.join(os.path.dirname(__file__), "temp")
+TEMP_DIR = os.environ.get("TEMP_DIR", os.path.join(os.path.dirname(__file__), "temp"))
 os.makedirs(TEMP_DIR, exist_ok=True)
 
-# Store active games
-active_games = {}
+# Persistent game state (GAME_STORAGE=memory or sqlite)
+storage = create_storage()
+
+# Encoded game images, served from memory within IMAGE_MEMORY_BUDGET bytes
+# (also written to disk right away when games are persisted, so they can be recovered)
+image_store = ImageStore(TEMP_DIR, write_through=storage.persistent)
+
+# Store active games (indexed by creator and channel, with an expiry heap)
+active_games = GameRegistry()
 # Format: {
 #   "game_id": {
-#     "image_path": "path/to/image.png",
+#     "image_path": "path/to/image.png",  # only exists on disk if spilled
+#     "image_formats": ["webp", "jpeg", "png"],  # encoded variants, smallest first
 #     "expiry_time": timestamp,
 #     "x_pos": x,
 #     "y_pos": y,
 #     "width": w,
 #     "height": h,
+#     "hitbox": (left, top, right, bottom),  # padded, in image pixels
+#     "win_token": "token",  # handed out for a verified click, required by /found/
 #     "discord_channel_id": id,
 #     "creator_user_id": id,
 #     "finder_callback": callback_function,
@@ -30,7 +61,50 @@ active_games = {}
 
 # Server settings
 HOST = "0.0.0.0"  # Listen on all interfaces to make it publicly accessible
-PORT = 9090  # Updated port for Ubuntu server
+PORT = int(os.environ.get("PORT", "9090"))  # Updated port for Ubuntu server
+# Number of worker threads serving requests (can be overridden from the .env file)
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", "32"))
+# Idle keep-alive connections are closed after this many seconds (they wait in a
+# selector meanwhile, not on a worker); also the socket timeout mid-request
+KEEPALIVE_TIMEOUT = float(os.environ.get("WEB_KEEPALIVE_TIMEOUT", "5"))
+# Pages are compiled once at startup; their CSS and JS are served from /static/
+STATIC_ASSETS = load_static_assets()
+GAME_PAGE = load_template("game.html").bind(
+    css_url=STATIC_ASSETS["game.css"].url,
+    js_url=STATIC_ASSETS["game.js"].url,
+)
+FOUND_PAGE = load_template("found.html").bind(css_url=STATIC_ASSETS["game.css"].url)
+# How the web tier runs (WEB_MODE, set in the bot's .env):
+#   "embedded" - the bot process serves HTTP itself (default)
+#   "external" - standalone workers (python web_server.py --processes N) serve HTTP
+#                from the shared SQLite store and report wins over NOTIFY_SOCKET
+WEB_MODE = os.environ.get("WEB_MODE", "embedded").lower()
+# True inside a standalone worker process: games are read from the shared
+# store and the bot process owns their images and rows
+WORKER_MODE = False
+# Clicks this many image pixels around Benny still count (can be overridden from the .env file)
+HITBOX_PADDING = int(os.environ.get("HITBOX_PADDING", "15"))
+# Largest click-check body we read ("x,y")
+MAX_CLICK_BODY = 64
+# Click-check answer for a miss, built once
+CLICK_MISS = b'{"hit": false}'
+# Misses a player (IP address) may make in a game before click checks are refused
+# with 429, refilled at CLICK_MISS_RATE per second (can be overridden from the .env
+# file). At the defaults, sweeping the image in hitbox-sized steps takes longer than
+# a game lasts, while a player clicking around by hand never notices.
+CLICK_MISS_BURST = int(os.environ.get("CLICK_MISS_BURST", "10"))
+CLICK_MISS_RATE = float(os.environ.get("CLICK_MISS_RATE", "0.5"))
+# Addresses of reverse proxies (e.g. nginx) in front of the server, comma separated
+# (can be overridden from the .env file). Requests from these are keyed on the
+# X-Forwarded-For client instead, so players behind the proxy get their own miss
+# budget. Off by default: the header is trivially forged by anyone else.
+TRUSTED_PROXIES = frozenset(filter(None, (ip.strip() for ip in os.environ.get("TRUSTED_PROXIES", "").split(","))))
+# Game images never change after they are created
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Format: {file extension: content type}
+IMAGE_CONTENT_TYPES = {ext: content_type for ext, content_type in IMAGE_FORMAT_INFO.values()}
+# Names of the images we write to TEMP_DIR: a 12 hex digit game id plus a format's extension
+GAME_IMAGE_NAME = re.compile(r"[0-9a-f]{12}\.(?:%s)" % "|".join(re.escape(ext) for ext in IMAGE_CONTENT_TYPES))
 
 # For server deployment
 def get_public_url():
@@ -73,11 +147,338 @@ def get_public_url():
     # Default to 127.0.0.1 (localhost) instead of 0.0.0.0 as a last resort
     return f"http://127.0.0.1:{PORT}"
 
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that handles requests on a fixed pool of worker threads
+
+    A worker serves a connection only while it has requests to answer.
+    Once a keep-alive connection goes quiet it is parked in a selector
+    watched by one idle thread, and handed back to the pool when the next
+    request arrives, so players who have loaded the page but aren't
+    clicking don't tie up workers. Parked connections are closed after
+    keepalive_timeout seconds.
+    """
+
+    # Allow a burst of players to connect while every worker is busy
+    request_queue_size = 256
+    # Tells WhereIsBennyHandler it may park idle connections here
+    parks_idle_connections = True
+
+    def __init__(self, server_address, handler_class, workers=WEB_WORKERS, keepalive_timeout=KEEPALIVE_TIMEOUT):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.keepalive_timeout = keepalive_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="web")
+        # Sockets handed over to the event hub, which closes them itself
+        self.detached = set()
+        # The idle thread and its selector are created on first use, so a server
+        # created before forking (run_standalone) gets its own in each worker
+        self._idle_thread = None
+        self._idle_lock = threading.Lock()
+        # Handlers waiting to be registered by the idle thread
+        self._to_park = deque()
+        # Format: {socket: (handler, parked_at)}, longest parked first
+        self._parked = OrderedDict()
+        self._idle_running = False
+
+    def process_request(self, request, client_address):
+        """Hand the connection to a worker instead of serving it inline"""
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def process_request_thread(self, request, client_address, handler=None):
+        """Serve a connection until it closes or goes idle; handler is set when resuming"""
+        try:
+            if handler is None:
+                handler = self.finish_request(request, client_address)
+            else:
+                handler.resume()
+            if handler.parked:
+                # From here on only the idle thread touches the socket
+                self._park(handler)
+                return
+        except Exception:
+            self.handle_error(request, client_address)
+        self.shutdown_request(request)
+
+    def _park(self, handler):
+        with self._idle_lock:
+            if self._idle_thread is None:
+                self._start_idle_thread()
+            self._to_park.append(handler)
+        self._wake_idle()
+
+    def _start_idle_thread(self):
+        self._idle_selector = selectors.DefaultSelector()
+        self._idle_wake_recv, self._idle_wake_send = socket.socketpair()
+        self._idle_wake_recv.setblocking(False)
+        self._idle_wake_send.setblocking(False)
+        self._idle_selector.register(self._idle_wake_recv, selectors.EVENT_READ)
+        self._idle_running = True
+        self._idle_thread = threading.Thread(target=self._idle_loop, name="web-idle")
+        self._idle_thread.daemon = True
+        self._idle_thread.start()
+
+    def _wake_idle(self):
+        try:
+            self._idle_wake_send.send(b"\0")
+        except (BlockingIOError, OSError):
+            # Already woken (or shutting down)
+            pass
+
+    def _close_parked(self, handler):
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        HTTPServer.shutdown_request(self, handler.request)
+
+    def _idle_loop(self):
+        while self._idle_running:
+            for key, events in self._idle_selector.select(timeout=1):
+                if key.fileobj is self._idle_wake_recv:
+                    try:
+                        while self._idle_wake_recv.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                # The next request (or the client hanging up): back to the pool
+                self._idle_selector.unregister(key.fileobj)
+                del self._parked[key.fileobj]
+                handler = key.data
+                try:
+                    self.executor.submit(self.process_request_thread, handler.request, handler.client_address, handler)
+                except RuntimeError:
+                    # The pool is shutting down
+                    self._close_parked(handler)
+
+            with self._idle_lock:
+                to_park = list(self._to_park)
+                self._to_park.clear()
+            now = time.time()
+            for handler in to_park:
+                self._idle_selector.register(handler.request, selectors.EVENT_READ, handler)
+                self._parked[handler.request] = (handler, now)
+
+            # Close connections that have been idle too long
+            while self._parked:
+                sock, (handler, parked_at) = next(iter(self._parked.items()))
+                if now - parked_at < self.keepalive_timeout:
+                    break
+                del self._parked[sock]
+                self._idle_selector.unregister(sock)
+                self._close_parked(handler)
+
+        for handler, parked_at in list(self._parked.values()):
+            self._close_parked(handler)
+        self._parked.clear()
+
+    def detach(self, request):
+        """Keep the connection open after the handler returns"""
+        self.detached.add(request)
+
+    def shutdown_request(self, request):
+        if request in self.detached:
+            self.detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        """Ignore players closing the connection mid-response"""
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+        if self._idle_thread is not None:
+            self._idle_running = False
+            self._wake_idle()
+            self._idle_thread.join(timeout=5)
+
+    def idle_connections(self):
+        """Number of keep-alive connections parked between requests"""
+        return len(self._parked)
+
 class WhereIsBennyHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests (every response sets Content-Length)
+    protocol_version = "HTTP/1.1"
+    # Socket timeout, so idle keep-alive connections don't hold a worker forever
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY the body
+    # waits for the client's delayed ACK on every keep-alive response
+    disable_nagle_algorithm = True
+
     def log_message(self, format, *args):
         """Silence server logs for cleanliness"""
         return
 
+    def handle(self):
+        """Serve requests while the client is sending them, then park the connection"""
+        self.parked = False
+        self.close_connection = True
+        self.handle_one_request()
+        self.serve_pending()
+
+    def resume(self):
+        """Serve the request that woke a parked connection (PooledHTTPServer)"""
+        self.parked = False
+        self.close_connection = True
+        try:
+            self.handle_one_request()
+            self.serve_pending()
+        finally:
+            if not self.parked:
+                self.finish()
+
+    def serve_pending(self):
+        """Keep answering requests that are already waiting; park once there are none"""
+        can_park = getattr(self.server, "parks_idle_connections", False)
+        while not self.close_connection:
+            if can_park and not self.request_waiting():
+                self.parked = True
+                return
+            self.handle_one_request()
+
+    def request_waiting(self):
+        """Check, without blocking, whether the next request has started arriving"""
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            # A broken connection: let handle_one_request find out
+            return True
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def finish(self):
+        # A parked connection stays open; the server finishes it later
+        if not self.parked:
+            super().finish()
+
+    def client_ip(self):
+        """The player's address, looking through TRUSTED_PROXIES via X-Forwarded-For"""
+        address = self.client_address[0]
+        if address not in TRUSTED_PROXIES:
+            return address
+        # Each proxy appends the address it got the request from; the first one
+        # from the right that isn't ours is the player
+        forwarded = [ip.strip() for ip in ",".join(self.headers.get_all("X-Forwarded-For", [])).split(",")]
+        for ip in reversed(forwarded):
+            if ip and ip not in TRUSTED_PROXIES:
+                return ip
+        return address
+
+    def send_body(self, body, content_type):
+        """Send a 200 response with a complete body"""
+        self.send_response(200)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_static_asset(self, asset):
+        """Send a pre-compressed static asset, or 304 if the client has it"""
+        if asset.etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", asset.etag)
+            self.send_header("Cache-Control", STATIC_CACHE_CONTROL)
+            self.end_headers()
+            return
+
+        encoding, body = asset.choose_encoding(self.headers.get("Accept-Encoding", ""))
+        self.send_response(200)
+        self.send_header("Content-type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", asset.etag)
+        self.send_header("Cache-Control", STATIC_CACHE_CONTROL)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_event_stream(self, game_id):
+        """Open a Server-Sent Events stream and hand it to the event hub"""
+        game = lookup_game(game_id)
+        if game is None or time.time() > game["expiry_time"]:
+            # 204 tells EventSource not to reconnect
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        if not event_hub.reserve():
+            # Too many open streams; EventSource doesn't retry after a non-200
+            # response, so the page just falls back to its own countdown
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        try:
+            self.send_response(200)
+            self.send_header("Content-type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            # Sync the page's countdown with the server
+            self.wfile.write(b"retry: 5000\n" + format_event("hello", {"time_left": int(game["expiry_time"] - time.time())}))
+        except OSError:
+            event_hub.release()
+            raise
+        
+        self.close_connection = True
+        self.server.detach(self.request)
+        event_hub.subscribe(game_id, self.request)
+
+    def send_image_headers(self, image_name, length, etag, vary=False):
+        """Send the headers for an image response
+
+        Game images never change once created, so they get a strong ETag
+        and an immutable Cache-Control, and reloads are answered with 304.
+        Set vary when the format was picked from the Accept header.
+        Returns False if the client's copy is current and no body should follow.
+        """
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", IMAGE_CACHE_CONTROL)
+            if vary:
+                self.send_header("Vary", "Accept")
+            self.end_headers()
+            return False
+
+        self.send_response(200)
+        extension = image_name.rsplit(".", 1)[-1]
+        self.send_header("Content-type", IMAGE_CONTENT_TYPES.get(extension, "application/octet-stream"))
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", IMAGE_CACHE_CONTROL)
+        if vary:
+            self.send_header("Vary", "Accept")
+        self.end_headers()
+        return True
+
+    def send_image_bytes(self, image_name, data, etag, vary=False):
+        """Send an image held in memory"""
+        if self.send_image_headers(image_name, len(data), etag, vary):
+            self.wfile.write(data)
+
+    def send_image_file(self, image_path, etag=None, vary=False):
+        """Stream an image file from disk"""
+        with open(image_path, "rb") as img_file:
+            stat = os.fstat(img_file.fileno())
+            if etag is None:
+                etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+            if self.send_image_headers(image_path, stat.st_size, etag, vary):
+                # Zero-copy send from the file to the socket (falls back to chunked reads)
+                self.connection.sendfile(img_file)
+
     def do_GET(self):
         """Handle GET requests for game pages and images"""
         parsed_url = urlparse(self.path)
@@ -86,39 +487,41 @@ class WhereIsBennyHandler(BaseHTTPRequestHandler):
         # Serve the game page
         if path.startswith("/game/"):
             game_id = path.split("/")[-1]
-            if game_id in active_games:
-                game = active_games[game_id]
+            game = lookup_game(game_id)
+            if game is not None:
                 # Check if game has expired
                 if time.time() > game["expiry_time"]:
                     self.send_error(404, "Game has expired")
-                    remove_game(game_id)
+                    if remove_game(game_id) is not None:
+                        event_hub.publish(game_id, "expired", {}, final=True)
                     return
                     
-                self.send_response(200)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                
-                # Generate HTML with clickable image map
-                html = generate_game_html(game_id, game)
-                self.wfile.write(html.encode())
+                # Render the game page, using the best image format for this browser
+                image_format = choose_image_format(game, self.headers.get("Accept", ""))
+                html = generate_game_html(game_id, game, image_format)
+                self.send_body(html, "text/html; charset=utf-8")
             else:
                 self.send_error(404, "Game not found")
         
         # Serve image files
         elif path.startswith("/images/"):
             image_name = path.split("/")[-1]
-            image_path = os.path.join(TEMP_DIR, image_name)
             
-            if os.path.exists(image_path):
-                self.send_response(200)
-                if image_path.endswith(".png"):
-                    self.send_header("Content-type", "image/png")
-                else:
-                    self.send_header("Content-type", "image/jpeg")
-                self.end_headers()
-                
-                with open(image_path, "rb") as img_file:
-                    self.wfile.write(img_file.read())
+            # No extension: pick the best format from the Accept header
+            game = lookup_game(image_name) if "." not in image_name else None
+            vary = game is not None
+            if vary:
+                image_format = choose_image_format(game, self.headers.get("Accept", ""))
+                image_name = f"{image_name}.{IMAGE_FORMAT_INFO[image_format][0]}"
+            
+            image_path = image_store.path(image_name)
+            image_data, etag = image_store.get(image_name)
+            
+            if image_data is not None:
+                # Hot images are served straight from memory
+                self.send_image_bytes(image_name, image_data, etag, vary)
+            elif os.path.isfile(image_path):
+                self.send_image_file(image_path, etag, vary)
             else:
                 self.send_error(404, "Image not found")
         
@@ -127,401 +530,192 @@ class WhereIsBennyHandler(BaseHTTPRequestHandler):
             query_components = parse_qs(parsed_url.query)
             game_id = path.split("/")[-1]
             finder_name = query_components.get("user", ["Unknown"])[0]
+            win_token = query_components.get("token", [""])[0]
             
-            if game_id in active_games:
-                game = active_games[game_id]
-                
+            # Only a player whose click the server verified has the game's token
+            game = lookup_game(game_id)
+            if game is not None and not (game.get("win_token") and
+                                         hmac.compare_digest(win_token.encode(), game["win_token"].encode())):
+                self.send_error(403, "Click on Benny first")
+                return
+            
+            # Atomically end the game so only the first finder wins
+            game = claim_game(game_id)
+            if game is not None:
                 # Call the callback function to notify Discord
                 if game["finder_callback"]:
                     game["finder_callback"](finder_name, game["discord_channel_id"], game["created_by"])
                 
-                # Return a success page
-                self.send_response(200)
-                self.send_header("Content-type", "text/html")
-                self.end_headers()
-                
-                success_html = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>Found Benny!</title>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; text-align: center; margin-top: 50px; }}
-                        .success {{ color: green; font-size: 24px; }}
-                    </style>
-                </head>
-                <body>
-                    <h1 class="success">Congratulations, {finder_name}!</h1>
-                    <p>You found Benny! The Discord channel has been notified.</p>
-                    <p>You can close this window now.</p>
-                </body>
-                </html>
-                """
-                self.wfile.write(success_html.encode())
+                # Tell everyone else still looking
+                event_hub.publish(game_id, "found", {"finder": finder_name}, final=True)
                 
-                # Remove the game after it's been found
-                remove_game(game_id)
+                # Return a success page
+                success_html = FOUND_PAGE.render(finder_name=finder_name)
+                self.send_body(success_html, "text/html; charset=utf-8")
             else:
                 self.send_error(404, "Game not found")
+        
+        # Live game events for an open game page
+        elif path.startswith("/events/"):
+            self.send_event_stream(path.split("/")[-1])
+        
+        # Serve the page's CSS and JS
+        elif path.startswith("/static/"):
+            asset = STATIC_ASSETS.get(path.split("/")[-1])
+            if asset is not None:
+                self.send_static_asset(asset)
+            else:
+                self.send_error(404, "Not found")
         else:
             self.send_error(404, "Not found")
 
-def generate_game_html(game_id, game):
-    """Generate HTML for the game page with clickable image map"""
-    # Get the image dimensions for the map
-    x, y = game["x_pos"], game["y_pos"]
-    width, height = game["width"], game["height"]
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Where's Benny?</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 0;
-                background-color: #f5f5f5;
-                text-align: center;
-                touch-action: manipulation; /* Prevent double-tap zoom */
-            }}
-            .container {{
-                max-width: 100%;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            h1 {{
-                color: #333;
-            }}
-            .game-image {{
-                position: relative;
-                margin: 20px auto;
-                max-width: 100%;
-                cursor: crosshair;
-                display: inline-block; /* Keep container tight to image */
-                -webkit-tap-highlight-color: rgba(0,0,0,0); /* Remove tap highlight on iOS */
-                touch-action: manipulation; /* Improve touch response */
-            }}
-            .game-image img {{
-                max-width: 100%;
-                height: auto;
-                border: 2px solid #333;
-                display: block; /* Remove extra space below image */
-                -webkit-user-select: none; /* Prevent selection on iOS */
-                user-select: none; /* Standard syntax */
-                -webkit-touch-callout: none; /* Disable callout */
-            }}
-            /* Benny target indicator - only visible in debug mode */
-            .benny-target-debug {{
-                position: absolute;
-                border: 2px dashed red;
-                background-color: rgba(255,0,0,0.3);
-                pointer-events: none;
-                z-index: 100;
-                display: none; /* Hidden by default */
-            }}
-            /* Style to prevent visible cursor change over clickable area */
-            area {{
-                cursor: inherit !important;
-            }}
-            /* For debug mode only - uncomment to see Benny's hitbox */
-            /*
-            .debug-hitbox {{
-                position: absolute;
-                border: 2px solid red;
-                background-color: rgba(255,0,0,0.3);
-                pointer-events: none;
-                z-index: 100;
-            }}
-            */
-            .timer {{
-                margin-top: 20px;
-                font-size: 18px;
-                color: #555;
-            }}
-            .instructions {{
-                margin-bottom: 20px;
-                color: #555;
-            }}
-            /* Modal popup styles */
-            .modal {{
-                display: none;
-                position: fixed;
-                z-index: 100;
-                left: 0;
-                top: 0;
-                width: 100%;
-                height: 100%;
-                background-color: rgba(0,0,0,0.7);
-                align-items: center;
-                justify-content: center;
-            }}
-            .modal-content {{
-                background-color: white;
-                padding: 30px;
-                border-radius: 10px;
-                max-width: 500px;
-                width: 80%;
-                text-align: center;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-            }}
-            input {{
-                display: block;
-                margin: 20px auto;
-                padding: 10px;
-                width: 80%;
-                font-size: 16px;
-                border: 1px solid #ddd;
-                border-radius: 4px;
-            }}
-            button {{
-                background-color: #4CAF50;
-                color: white;
-                padding: 10px 20px;
-                border: none;
-                border-radius: 4px;
-                font-size: 16px;
-                cursor: pointer;
-                transition: background-color 0.3s;
-            }}
-            button:hover {{
-                background-color: #45a049;
-            }}
-            h2 {{
-                color: #333;
-                margin-top: 0;
-            }}
-            .benny-hotspot {{
-                cursor: inherit !important;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Where's Benny?</h1>
-            <div class="instructions">Find and click on Benny in the image below!</div>
-            
-            <div class="game-image" id="gameImageContainer">
-                <img src="/images/{game_id}.png" id="gameImage" alt="Where's Benny?">
-                <!-- We'll handle click detection in JavaScript for faster mobile response -->
-                <!-- Benny's position is at: x={x}, y={y}, w={width}, h={height} -->
-            </div>
-            
-            <div class="timer">Game expires in <span id="countdown">5:00</span></div>
-        </div>
+    def do_POST(self):
+        """Handle click checks: POST /click/<game_id> with an "x,y" body in image pixels"""
+        path = urlparse(self.path).path
+        if not path.startswith("/click/"):
+            self.send_error(404, "Not found")
+            return
         
-        <!-- Name input modal popup -->
-        <div id="nameModal" class="modal">
-            <div class="modal-content">
-                <h2>You found Benny!</h2>
-                <p>Enter your name to claim victory:</p>
-                <input type="text" id="username-input" placeholder="Your name" autofocus>
-                <button onclick="submitName()">Submit</button>
-            </div>
-        </div>
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if not 0 < length <= MAX_CLICK_BODY:
+            self.send_error(400, "Bad click")
+            return
+        body = self.rfile.read(length)
         
-        <script>
-            // Store Benny's position and game data
-            const bennyData = {{
-                x: {x},
-                y: {y},
-                width: {width},
-                height: {height},
-                padding: 15  // Extra padding to make it easier to tap
-            }};
-            
-            // Setup countdown timer
-            let timeLeft = {int(game["expiry_time"] - time.time())};
-            const countdownEl = document.getElementById('countdown');
-            const nameModal = document.getElementById('nameModal');
-            
-            // Simple timer function
-            function updateTimer() {{
-                if (timeLeft <= 0) {{
-                    window.location.href = "/"; // Game expired
-                    return;
-                }}
-                
-                const minutes = Math.floor(timeLeft / 60);
-                const seconds = timeLeft % 60;
-                countdownEl.textContent = `${{minutes}}:${{seconds.toString().padStart(2, '0')}}`;
-                timeLeft--;
-                setTimeout(updateTimer, 1000);
-            }}
-            
-            // Start the timer
-            updateTimer();
-            
-            // Fast mobile touch handling (no delay)
-            function setupFastTouchHandling() {{
-                const container = document.getElementById('gameImageContainer');
-                const img = document.getElementById('gameImage');
-                
-                if (!container || !img) return;
-                
-                // Pre-calculate values once for better performance
-                let imgWidth, imgHeight, scaleX, scaleY;
-                
-                function updateDimensions() {{
-                    // Get current display dimensions
-                    imgWidth = img.clientWidth;
-                    imgHeight = img.clientHeight;
-                    
-                    // Calculate scale ratio
-                    scaleX = imgWidth / img.naturalWidth;
-                    scaleY = imgHeight / img.naturalHeight;
-                    
-                    // DEBUG: Uncomment to show Benny's location
-                    // showDebugOverlay();
-                }}
-                
-                // Optional: Show debug overlay to see where Benny is located
-                function showDebugOverlay() {{
-                    let overlay = document.querySelector('.benny-target-debug');
-                    if (!overlay) {{
-                        overlay = document.createElement('div');
-                        overlay.className = 'benny-target-debug';
-                        container.appendChild(overlay);
-                    }}
-                    
-                    // Position the overlay at Benny's location
-                    const scaledX = bennyData.x * scaleX;
-                    const scaledY = bennyData.y * scaleY;
-                    const scaledWidth = bennyData.width * scaleX;
-                    const scaledHeight = bennyData.height * scaleY;
-                    
-                    overlay.style.left = scaledX + 'px';
-                    overlay.style.top = scaledY + 'px';
-                    overlay.style.width = scaledWidth + 'px';
-                    overlay.style.height = scaledHeight + 'px';
-                    overlay.style.display = 'block';
-                }}
-                
-                // Handle click/tap events with maximum efficiency
-                function handleInteraction(event) {{
-                    // Get interaction coordinates
-                    let x, y;
-                    
-                    // Touch event
-                    if (event.touches && event.touches.length > 0) {{
-                        const rect = img.getBoundingClientRect();
-                        x = event.touches[0].clientX - rect.left;
-                        y = event.touches[0].clientY - rect.top;
-                        event.preventDefault(); // Prevent scrolling/zooming
-                    }} 
-                    // Mouse event
-                    else {{
-                        const rect = img.getBoundingClientRect();
-                        x = event.clientX - rect.left;
-                        y = event.clientY - rect.top;
-                    }}
-                    
-                    // Calculate scaled position of Benny
-                    const scaledX = bennyData.x * scaleX;
-                    const scaledY = bennyData.y * scaleY;
-                    const scaledWidth = bennyData.width * scaleX;
-                    const scaledHeight = bennyData.height * scaleY;
-                    const padding = bennyData.padding * scaleX; // Scale padding too
-                    
-                    // Check if click/tap is on Benny
-                    if (x >= (scaledX - padding) && 
-                        x <= (scaledX + scaledWidth + padding) && 
-                        y >= (scaledY - padding) && 
-                        y <= (scaledY + scaledHeight + padding)) {{
-                        foundBenny();
-                        return false;
-                    }}
-                }}
-                
-                // Add all event listeners with the right flags for performance
-                img.addEventListener('click', handleInteraction, false);
-                img.addEventListener('touchstart', handleInteraction, {{passive: false}});
-                
-                // Handle resize to keep coordinates correct
-                window.addEventListener('resize', updateDimensions);
-                
-                // Initialize dimensions
-                img.onload = updateDimensions;
-                // If image might already be loaded
-                if (img.complete) {{
-                    updateDimensions();
-                }}
-            }}
-            
-            // When Benny is found, show the name input modal
-            function foundBenny() {{
-                // Show modal immediately (better response time)
-                nameModal.style.display = 'flex';
-                
-                // Focus the input field (slight delay to ensure modal is visible first)
-                setTimeout(function() {{
-                    document.getElementById('username-input').focus();
-                }}, 10);
-                
-                // Allow Enter key to submit
-                document.getElementById('username-input').addEventListener('keyup', function(event) {{
-                    if (event.key === 'Enter') {{
-                        submitName();
-                    }}
-                }});
-            }}
-            
-            // Submit name and redirect
-            function submitName() {{
-                const name = document.getElementById('username-input').value || 'Anonymous';
-                window.location.href = `/found/{game_id}?user=${{encodeURIComponent(name)}}`;
-            }}
-            
-            // Initialize everything when page loads
-            window.addEventListener('DOMContentLoaded', function() {{
-                setupFastTouchHandling();
-            }});
-            
-        </script>
-    </body>
-    </html>
+        game_id = path.split("/")[-1]
+        game = lookup_game(game_id)
+        if game is None or time.time() > game["expiry_time"]:
+            self.send_error(404, "Game not found")
+            return
+        
+        # Out of misses: refuse before checking, so a sweep learns nothing
+        miss_key = f"{game_id}:{self.client_ip()}"
+        with click_limiter_lock:
+            wait = click_limiter.wait_time(miss_key)
+        if wait > 0:
+            self.send_response(429)
+            self.send_header("Retry-After", str(int(wait) + 1))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        try:
+            x, y = body.split(b",")
+            hit = check_click(game, int(x), int(y))
+        except ValueError:
+            self.send_error(400, "Bad click")
+            return
+        
+        if hit:
+            self.send_body(json.dumps({"hit": True, "token": game.get("win_token", "")}).encode(), "application/json")
+        else:
+            with click_limiter_lock:
+                click_limiter.bucket(miss_key).try_acquire()
+            self.send_body(CLICK_MISS, "application/json")
+
+def choose_image_format(game, accept_header):
+    """Pick the smallest image variant the browser accepts
+
+    PNG and JPEG work everywhere; WebP is only used when the browser lists
+    it explicitly, since older browsers send */* without supporting it.
     """
-    return html
+    accepted = {"png", "jpeg"}
+    if "image/webp" in accept_header.lower():
+        accepted.add("webp")
+    for image_format in game.get("image_formats", ["png"]):
+        if image_format in accepted:
+            return image_format
+    return "png"
+
+def generate_game_html(game_id, game, image_format="png"):
+    """Render the game page as UTF-8 bytes
+
+    The CSS and JS live in /static/ and are cached by the browser. The
+    game's own values are baked into a per-game copy of the template on
+    first view, and the rendered page is reused until the countdown ticks.
+    """
+    time_left = max(0, int(game["expiry_time"] - time.time()))
+    
+    # Format: {image_format: [template, time_left, page]}
+    pages = game.setdefault("pages", {})
+    cached = pages.get(image_format)
+    if cached is None:
+        template = GAME_PAGE.bind(
+            game_id=game_id,
+            image_name=f"{game_id}.{IMAGE_FORMAT_INFO[image_format][0]}",
+        )
+        cached = pages[image_format] = [template, None, None]
+    elif cached[1] == time_left:
+        return cached[2]
+    
+    page = cached[0].render(time_left=time_left, countdown=f"{time_left // 60}:{time_left % 60:02d}")
+    cached[1:] = [time_left, page]
+    return page
 
 def start_server():
     """Start the HTTP server in a separate thread"""
-    server = HTTPServer((HOST, PORT), WhereIsBennyHandler)
+    server = PooledHTTPServer((HOST, PORT), WhereIsBennyHandler)
     server_thread = threading.Thread(target=server.serve_forever)
     server_thread.daemon = True
     server_thread.start()
-    print(f"Started HTTP server at http://{HOST}:{PORT}")
+    event_hub.start()
+    print(f"Started HTTP server at http://{HOST}:{PORT} with {server.workers} workers")
     return server
 
 def stop_server(server):
     """Stop the HTTP server"""
     server.shutdown()
     server.server_close()
+    event_hub.stop()
     print("Stopped HTTP server")
 
 def create_game(image, x_pos, y_pos, width, height, discord_channel_id, creator_id, creator_name, finder_callback):
-    """Create a new game and return its ID and URL"""
+    """Create a new game and return its ID and URL
+
+    image is a PIL image, already-encoded PNG bytes, or a
+    {format: bytes} dict of variants from image_pipeline.encode_variants.
+    """
     # Generate a unique ID for this game
     game_id = str(uuid.uuid4()).replace("-", "")[:12]
     
-    # Save the image to a file
-    image_path = os.path.join(TEMP_DIR, f"{game_id}.png")
-    image.save(image_path, "PNG")
+    # Encode the image if needed
+    if isinstance(image, dict):
+        variants = image
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        variants = {"png": image}
+    else:
+        variants = encode_variants(image)
+    
+    # Keep the images in memory (they're written to files if we're over budget)
+    for image_format, image_data in variants.items():
+        image_store.put(f"{game_id}.{IMAGE_FORMAT_INFO[image_format][0]}", image_data)
+    image_path = image_store.path(f"{game_id}.png")
     
     # Create game entry with 5-minute expiry
-    active_games[game_id] = {
+    active_games.add(game_id, {
         "image_path": image_path,
+        "image_formats": sorted(variants, key=lambda image_format: len(variants[image_format])),
         "expiry_time": time.time() + 300,  # 5 minutes
         "x_pos": x_pos,
         "y_pos": y_pos,
         "width": width,
         "height": height,
+        "hitbox": make_hitbox(x_pos, y_pos, width, height),
+        "win_token": secrets.token_urlsafe(16),
         "discord_channel_id": discord_channel_id,
         "creator_user_id": creator_id,
         "finder_callback": finder_callback,
         "created_by": creator_name
-    }
+    })
+    
+    # Persist the game so it survives a restart
+    storage.save_game(game_id, active_games[game_id])
+    
+    # Make sure the expiry scheduler knows about the new game
+    expiry_scheduler.wake()
     
     # Create the game URL using the public URL from Replit if available
     base_url = get_public_url()
@@ -529,57 +723,303 @@ def create_game(image, x_pos, y_pos, width, height, discord_channel_id, creator_
     
     return game_id, game_url
 
-def remove_game(game_id):
-    """Remove a game and its resources"""
-    if game_id in active_games:
-        # Delete the image file
-        image_path = active_games[game_id]["image_path"]
-        try:
-            if os.path.exists(image_path):
-                os.remove(image_path)
-        except Exception as e:
-            print(f"Error removing game file: {e}")
+# Miss budget per game and player, shared by the handler threads (each worker
+# process in standalone mode keeps its own)
+click_limiter = KeyedRateLimiter(CLICK_MISS_RATE, CLICK_MISS_BURST)
+click_limiter_lock = threading.Lock()
+
+def make_hitbox(x_pos, y_pos, width, height, padding=HITBOX_PADDING):
+    """Return Benny's padded hitbox as (left, top, right, bottom) in image pixels"""
+    return (x_pos - padding, y_pos - padding, x_pos + width + padding, y_pos + height + padding)
+
+def check_click(game, x, y):
+    """Return True if a click at (x, y) in image pixels lands on Benny"""
+    # Games recovered from before hitboxes were stored get one on the fly
+    hitbox = game.get("hitbox") or make_hitbox(game["x_pos"], game["y_pos"], game["width"], game["height"])
+    left, top, right, bottom = hitbox
+    return left <= x <= right and top <= y <= bottom
+
+def lookup_game(game_id):
+    """Return an active game, or None
+
+    Standalone workers fall back to the shared store and cache what they find.
+    """
+    game = active_games.get(game_id)
+    if game is None and WORKER_MODE:
+        game = storage.load_game(game_id)
+        if game is not None:
+            # Wins are reported to the bot process instead of calling Discord directly
+            game["finder_callback"] = functools.partial(notify_bot_found, game_id)
+            active_games.add(game_id, game)
+            expiry_scheduler.wake()
+    return game
+
+def claim_game(game_id):
+    """Atomically end a game that's been found and return it
+
+    Returns None if the game doesn't exist, has expired or someone else
+    found Benny first (in any worker process).
+    """
+    if WORKER_MODE:
+        game = lookup_game(game_id)
+        if game is None or not storage.claim_game(game_id):
+            active_games.remove(game_id)
+            return None
+        # The bot process releases the images once it hears about the win
+        active_games.remove(game_id)
+        return game
+    
+    game = active_games.claim(game_id)
+    if game is not None:
+        # Release the game's images now that it's been found
+        release_game_resources(game_id, game)
+        storage.delete_game(game_id)
+    return game
+
+def notify_bot_found(game_id, finder_name, discord_channel_id, creator_name):
+    """Tell the bot process that Benny was found (standalone workers only)"""
+    send_notification({
+        "event": "found",
+        "game_id": game_id,
+        "finder_name": finder_name,
+        "discord_channel_id": discord_channel_id,
+        "created_by": creator_name,
+    })
+
+def handle_worker_event(message):
+    """Handle an event sent by a standalone web worker (runs in the bot process)"""
+    if message.get("event") == "found":
+        # The worker already claimed the game in the shared store
+        game = active_games.remove(message["game_id"])
+        if game is not None:
+            release_game_resources(message["game_id"], game)
+        storage.delete_game(message["game_id"])
         
-        # Remove from active games
-        del active_games[game_id]
+        if finder_callback:
+            finder_callback(message["finder_name"], message["discord_channel_id"], message["created_by"])
 
-def cleanup_expired_games():
-    """Remove expired games"""
-    now = time.time()
-    expired_games = [game_id for game_id, game in active_games.items() if now > game["expiry_time"]]
+def release_game_resources(game_id, game):
+    """Delete a removed game's images from memory or disk"""
+    for image_name in game_image_names(game_id, game):
+        image_store.remove(image_name)
+
+def remove_game(game_id):
+    """Remove a game and its resources; returns the game, or None if it was already gone"""
+    # Only the thread that actually removes the game releases its resources
+    game = active_games.remove(game_id)
+    if game is not None and not WORKER_MODE:
+        release_game_resources(game_id, game)
+        storage.delete_game(game_id)
+    return game
+
+def expire_games(batch):
+    """Release the resources of a batch of expired games and announce them"""
+    for game_id, game in batch:
+        event_hub.publish(game_id, "expired", {}, final=True)
+    
+    if WORKER_MODE:
+        # Workers only drop their cached copy; the bot process owns the game
+        return
+    
+    for game_id, game in batch:
+        release_game_resources(game_id, game)
+    storage.delete_games([game_id for game_id, game in batch])
     
-    for game_id in expired_games:
-        remove_game(game_id)
+    # Let Discord know nobody found Benny
+    if expired_callback:
+        for game_id, game in batch:
+            try:
+                expired_callback(game["discord_channel_id"], game["created_by"])
+            except Exception as e:
+                print(f"Error in expired callback: {e}")
+
+# Callback for found games, set by the bot: finder_callback(finder_name, channel_id, creator_name)
+finder_callback = None
+
+# Optional callback for games that expire unfound: expired_callback(channel_id, creator_name)
+expired_callback = None
+
+# Removes each game right at its expiry_time
+expiry_scheduler = ExpiryScheduler(active_games, expire_games)
+
+def sync_shared_games():
+    """Notice games found through another worker process (standalone workers only)
+
+    Runs on the event hub thread about once a second, only for games
+    that have open event streams in this process.
+    """
+    if not WORKER_MODE:
+        return
+    now = time.time()
+    for game_id in event_hub.subscribed_games():
+        game = active_games.get(game_id)
+        if game is not None and game["expiry_time"] > now and storage.load_game(game_id, now) is None:
+            # The row is gone before expiry, so another worker claimed the win
+            active_games.remove(game_id)
+            event_hub.publish(game_id, "found", {"finder": None}, final=True)
+
+# Pushes found/expired events to open game pages
+event_hub = EventHub(on_tick=sync_shared_games)
 
 # Start automatic cleanup in a background thread
-def start_cleanup_thread():
-    def cleanup_task():
-        while True:
-            cleanup_expired_games()
-            time.sleep(60)  # Check every minute
-    
-    cleanup_thread = threading.Thread(target=cleanup_task)
-    cleanup_thread.daemon = True
-    cleanup_thread.start()
+def start_expiry_scheduler():
+    expiry_scheduler.start()
 
 # Server instance
 server_instance = None
 
+def game_image_names(game_id, game):
+    """Return the file names of a game's image variants"""
+    return [f"{game_id}.{IMAGE_FORMAT_INFO[image_format][0]}" for image_format in game.get("image_formats", ["png"])]
+
+def recover_games():
+    """Reload live games from storage and delete orphaned temp files
+
+    Returns the number of games recovered.
+    """
+    now = time.time()
+    storage.delete_expired(now)
+    
+    recovered = 0
+    for game_id, game in storage.load_live_games(now).items():
+        # A game is only playable if its image survived
+        if not os.path.isfile(image_store.path(f"{game_id}.png")):
+            storage.delete_game(game_id)
+            continue
+        game["finder_callback"] = finder_callback
+        active_games.add(game_id, game)
+        recovered += 1
+    
+    # Garbage-collect images that don't belong to a live game, in one pass. TEMP_DIR
+    # can be pointed anywhere, so only files named like game images are touched
+    live_images = {name for game_id, game in active_games.items() for name in game_image_names(game_id, game)}
+    removed = 0
+    with os.scandir(TEMP_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and GAME_IMAGE_NAME.fullmatch(entry.name) and entry.name not in live_images:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except Exception as e:
+                    print(f"Error removing orphaned file: {e}")
+    
+    if recovered or removed:
+        print(f"Recovered {recovered} games, removed {removed} orphaned images")
+    expiry_scheduler.wake()
+    return recovered
+
+# Listener for events from standalone web workers (WEB_MODE=external)
+worker_listener = None
+
 def initialize():
     """Initialize the web server"""
-    global server_instance
+    global server_instance, worker_listener
     # Create temp directory if it doesn't exist
     os.makedirs(TEMP_DIR, exist_ok=True)
     
-    # Start the server
-    server_instance = start_server()
+    # Pick up games that were running before a restart
+    recover_games()
     
-    # Start cleanup thread
-    start_cleanup_thread()
+    if WEB_MODE == "external":
+        # Standalone workers serve HTTP; we just listen for their events
+        if not storage.persistent:
+            print("⚠️  WEB_MODE=external needs GAME_STORAGE=sqlite so workers can see the games")
+        worker_listener = NotificationListener(handle_worker_event)
+        worker_listener.start()
+    else:
+        # Start the server
+        server_instance = start_server()
+    
+    # Start the expiry scheduler
+    start_expiry_scheduler()
     
     return server_instance
 
+def run_worker(server):
+    """Serve requests in a forked worker process until told to stop"""
+    global storage, event_hub, WORKER_MODE
+    WORKER_MODE = True
+    # SQLite connections and the hub's wakeup socket must not be shared across fork
+    storage = create_storage()
+    event_hub = EventHub(on_tick=sync_shared_games)
+    event_hub.start()
+    start_expiry_scheduler()
+    
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        event_hub.stop()
+
+def run_standalone(processes):
+    """Run the web tier on its own: pre-forked workers sharing one listening socket
+
+    Game state comes from the shared SQLite store and wins are reported to
+    the bot over NOTIFY_SOCKET, so the bot must run with WEB_MODE=external.
+    """
+    if not storage.persistent:
+        print("ERROR: the standalone web server needs GAME_STORAGE=sqlite to share games with the bot.")
+        return 1
+    
+    # Bind once in the parent; every worker accepts on the inherited socket
+    server = PooledHTTPServer((HOST, PORT), WhereIsBennyHandler)
+    print(f"Started HTTP server at http://{HOST}:{PORT} with {processes} processes x {server.workers} workers")
+    
+    children = {}
+    stopping = False
+    
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(server)
+            finally:
+                os._exit(0)
+        children[pid] = time.time()
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    for _ in range(processes):
+        spawn()
+    
+    # Restart workers that die, until we're told to stop
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.pop(pid, None)
+        if not stopping:
+            print(f"Web worker {pid} exited ({status}), restarting it")
+            time.sleep(0.5)
+            spawn()
+    
+    server.socket.close()
+    print("Stopped HTTP server")
+    return 0
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Where's Benny web server")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="run standalone with this many pre-forked worker processes (needs GAME_STORAGE=sqlite)")
+    args = parser.parse_args()
+    
+    if args.processes:
+        sys.exit(run_standalone(args.processes))
+    
     # Test the server
     initialize()
     input("Press Enter to stop server...")
@@ -1,43 +1,79 @@
 import os
-import io
 import random
+import asyncio
 import discord
 from discord.ext import commands
-import requests
-from PIL import Image
-import time
 from dotenv import load_dotenv
 
+# Load environment variables (before importing our modules, which read their settings on import)
+load_dotenv()
+
 # Import the web server module
 import web_server
-
-# Load environment variables
-load_dotenv()
+# Async client for the image generation API
+import hf_client
+import image_generators
+from generation_queue import GenerationQueue, GenerationJob, QueueFull
+from background_pool import BackgroundPool, SharedBackgrounds
+from benny_sprite import SpriteCache
+from image_pipeline import ImagePipeline
+from compositor import Compositor
+from notifier import ChannelNotifier
+from rate_limiter import RateLimits
+
+class WhereIsBennyBot(commands.Bot):
+    """commands.Bot that also shuts down our own clients and workers"""
+
+    async def close(self):
+        # Stop making new work, then close the pooled API session and worker threads
+        background_pool.stop()
+        await notifier.close()
+        await image_client.close()
+        image_pipeline.shutdown(wait=False)
+        await super().close()
 
 # Set up Discord bot with intents
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = WhereIsBennyBot(command_prefix='!', intents=intents)
 
 # Path to Benny image
 BENNY_IMAGE_PATH = os.path.join(os.path.dirname(__file__), "benny.png")
 
-# Hugging Face API endpoint for image generation
-HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
-HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
+# Decoded Benny sprite with pre-scaled variants for the 3-8% height range
+benny_sprite = SpriteCache(BENNY_IMAGE_PATH, alpha_factor=0.9)
 
-# Headers for Hugging Face API
-headers = {
-    "Authorization": f"Bearer {HUGGINGFACE_API_KEY}"
-}
+# Sizes, places and pastes Benny into backgrounds
+compositor = Compositor(benny_sprite)
+
+# Shared async image generator, picked with IMAGE_BACKEND: the Hugging Face API
+# (pooled session, never blocks the event loop) or a local stand-in for testing
+image_client = image_generators.create_generator()
+
+# Post a notice when a game expires without anyone finding Benny (off unless
+# EXPIRY_NOTICES=1 is set in the .env file)
+EXPIRY_NOTICES = os.getenv("EXPIRY_NOTICES", "0").lower() not in ("0", "false", "no")
 
-# Track last image generation to prevent spam
-# Format: {user_id: timestamp}
-last_generated = {}
+# Per-user, per-channel and per-guild limits on starting games (RATE_LIMIT_* in .env),
+# restored from storage after a restart when games are persisted
+rate_limits = RateLimits(storage=web_server.storage)
 
-# Global variable to track if we're currently generating an image
-# This prevents simultaneous generations
-generating_image = False
+# Bounded queue of image generations, shared by every guild and channel
+generation_queue = GenerationQueue()
+
+# Worker threads for decoding, compositing and encoding images off the event loop
+image_pipeline = ImagePipeline()
+
+async def send_channel_message(channel_id, text):
+    """Send a message to a channel by ID (used by the notifier)"""
+    channel = bot.get_channel(int(channel_id))
+    if channel is None:
+        print(f"Channel {channel_id} not found, dropping notification")
+        return
+    await channel.send(text)
+
+# Found/expired announcements, batched per channel and kept under Discord's rate limits
+notifier = ChannelNotifier(send_channel_message, no_retry=(discord.Forbidden, discord.NotFound))
 
 # Load backgrounds for where's Waldo style images from file
 def load_prompts_from_file():
@@ -276,207 +312,123 @@ BACKGROUND_PROMPTS = [
     "a busy art restoration studio with conservators in the style of Where's Waldo, detailed cultural illustration"
 ]
 
-@bot.event
-async def on_ready():
-    """Event fired when the bot successfully connects to Discord"""
-    print(f"Bot is logged in as {bot.user}")
-    print("=" * 40)
-    print("WHERE'S BENNY BOT IS READY!")
-    print("=" * 40)
-
-def adjust_transparency(img, alpha_factor=0.85):
-    """Adjust the transparency of an image"""
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
-
-    # Get the alpha channel
-    data = img.getdata()
-    new_data = []
-
-    for item in data:
-        # Apply alpha factor to the alpha channel (index 3)
-        new_data.append((item[0], item[1], item[2], int(item[3] * alpha_factor) if len(item) > 3 else 255))
-
-    img.putdata(new_data)
-    return img
-
-def resize_benny(background_img, min_height_percent=0.03, max_height_percent=0.08):
-    """Resize Benny image to maintain proportions and scale appropriately for the scene"""
-    try:
-        # Open original Benny image
-        benny_img = Image.open(BENNY_IMAGE_PATH)
-
-        # Get background dimensions
-        bg_width, bg_height = background_img.size
-
-        # Calculate appropriate size range based on the background size
-        # This makes Benny proportional to the scene - smaller in landscapes with many tiny people
-        # and larger in closer-up scenes
-        min_height = int(bg_height * min_height_percent)  # Minimum 3% of image height
-        max_height = int(bg_height * max_height_percent)  # Maximum 8% of image height
-
-        # Choose a random size within the appropriate range
-        new_height = random.randint(min_height, max_height)
-
-        # Calculate proportional width
-        width, height = benny_img.size
-        new_width = int((new_height/height) * width)
-
-        # Resize image
-        resized_benny = benny_img.resize((new_width, new_height))
-
-        # Add slight transparency to help blend with the scene
-        resized_benny = adjust_transparency(resized_benny, alpha_factor=0.9)
-
-        return resized_benny
-    except Exception as e:
-        print(f"Error resizing Benny: {e}")
-        return None
-
-def place_benny_on_background(background_img):
-    """Place Benny on a random location in the background"""
-    try:
-        # Get background dimensions
-        bg_width, bg_height = background_img.size
-
-        # Check if Benny image exists
-        if not os.path.exists(BENNY_IMAGE_PATH):
-            print(f"ERROR: Benny image not found at {BENNY_IMAGE_PATH}")
-            return background_img
+# Keywords used to group the prompts into categories for the background pool
+# The first matching category wins; anything else is "indoor"
+PROMPT_CATEGORY_KEYWORDS = {
+    "water": ["beach", "pool", "swim", "water", "aquarium", "sailing", "regatta", "fishing", "pier",
+              "boat", "cruise", "surfing", "diving", "aquatic", "hot spring"],
+    "winter": ["ski", "winter", "ice", "snow", "holiday", "halloween"],
+    "outdoor": ["outdoor", "park", "festival", "fair", "market", "garden", "street", "stadium", "race",
+                "trail", "field", "zoo", "safari", "campus", "playground", "parade", "orchard", "course"],
+}
 
-        # Resize Benny to a size appropriate for the scene
-        benny_img = resize_benny(background_img)  # Smart sizing based on background
-        if not benny_img:
-            return background_img
+def group_prompts_by_category(prompts):
+    """Group background prompts into categories by keyword"""
+    categories = {category: [] for category in PROMPT_CATEGORY_KEYWORDS}
+    categories["indoor"] = []
+    for prompt in prompts:
+        scene = prompt.split(" in the style of")[0].lower()
+        for category, keywords in PROMPT_CATEGORY_KEYWORDS.items():
+            if any(keyword in scene for keyword in keywords):
+                categories[category].append(prompt)
+                break
+        else:
+            categories["indoor"].append(prompt)
+    return {category: prompts for category, prompts in categories.items() if prompts}
 
-        b_width, b_height = benny_img.size
-        print(f"Benny sized to: {b_width}x{b_height} pixels (proportional to scene)")
+def build_payload(background_prompt):
+    """Build the Hugging Face payload for a background prompt"""
+    # Create prompt for Hugging Face - just generate the background
+    prompt = f"{background_prompt}, without any specific characters, highly detailed cartoon illustration"
 
-        # Place Benny in a more interesting position - avoid dead center
-        # Divide the image into a 3x3 grid and choose one of the 9 cells
-        grid_x = random.randint(0, 2)  # 0, 1, or 2
-        grid_y = random.randint(0, 2)  # 0, 1, or 2
+    return {
+        "inputs": prompt,
+        "parameters": {
+            "negative_prompt": "blurry, distorted, low quality"
+        }
+    }
 
-        # Calculate the bounds of the selected grid cell
-        cell_width = bg_width // 3
-        cell_height = bg_height // 3
-        cell_x_start = grid_x * cell_width
-        cell_y_start = grid_y * cell_height
+async def generate_background(background_prompt):
+    """Generate a background for the pool and return the image bytes"""
+    return await image_client.generate(build_payload(background_prompt))
 
-        # Place Benny randomly within the selected grid cell
-        x_max = min(cell_x_start + cell_width, bg_width) - b_width
-        y_max = min(cell_y_start + cell_height, bg_height) - b_height
-        x_pos = random.randint(cell_x_start, max(cell_x_start, x_max))
-        y_pos = random.randint(cell_y_start, max(cell_y_start, y_max))
+# Warm pool of pre-generated backgrounds, refilled while no games are being generated
+background_pool = BackgroundPool(group_prompts_by_category(BACKGROUND_PROMPTS), generate_background)
 
-        print(f"Placing Benny at position: ({x_pos}, {y_pos}) in grid cell ({grid_x}, {grid_y})")
+# Each background feeds games in up to BACKGROUND_REUSES channels, and concurrent
+# requests share a generation that's already running
+shared_backgrounds = SharedBackgrounds()
 
-        # Create a composite image
-        result_img = background_img.copy()
+def generation_idle():
+    """Check if no games are waiting for or being generated"""
+    return len(generation_queue) == 0 and generation_queue.running == 0
 
-        # Paste Benny onto the background
-        result_img.paste(benny_img, (x_pos, y_pos), benny_img)
+@bot.event
+async def on_ready():
+    """Event fired when the bot successfully connects to Discord"""
+    # Start pre-generating backgrounds
+    background_pool.start(is_idle=generation_idle)
 
-        return result_img
-    except Exception as e:
-        print(f"Error placing Benny: {e}")
-        return background_img
+    print(f"Bot is logged in as {bot.user}")
+    print("=" * 40)
+    print("WHERE'S BENNY BOT IS READY!")
+    print("=" * 40)
 
 # Add function to check if a user has an active game
 def user_has_active_game(user_id):
     """Check if a user has an active game"""
-    current_time = time.time()
+    # Indexed lookup by creator instead of scanning every game
+    return web_server.active_games.find_by_creator(user_id)
 
-    # Check all active games
-    for game_id, game_data in web_server.active_games.items():
-        # If game hasn't expired and was created by this user
-        if game_data["expiry_time"] > current_time and str(game_data["creator_user_id"]) == str(user_id):
-            return game_id
-    return None
+def compose_game_image(image_bytes):
+    """Decode a background, hide Benny in it and encode the variants
 
-@bot.command(name='whereisbenny', aliases=['wib'])
-async def where_is_benny(ctx):
-    """Generate a Where's Waldo style image featuring Benny with clickable web interface"""
-    global headers
-    global generating_image
-
-    # Avoid multiple simultaneous image generations
-    if generating_image:
-        await ctx.send("I'm already generating an image! Please wait a moment.")
-        return
-
-    # Check if the user already has an active game
-    active_game = user_has_active_game(ctx.author.id)
-    if active_game:
-        # Get the game URL
-        base_url = web_server.get_public_url()
-        game_url = f"{base_url}/game/{active_game}"
+    Runs in an image pipeline worker thread. Returns a compositor.Composite
+    with the encoded variants, or None if Benny couldn't be loaded.
+    """
+    if not os.path.exists(BENNY_IMAGE_PATH):
+        print(f"ERROR: Benny image not found at {BENNY_IMAGE_PATH}")
+        return None
+    composite = compositor.compose_bytes(image_bytes)
+    print("Composited game image: " + ", ".join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in composite.timings.items()))
+    return composite
 
-        # Send a sassy message
-        await ctx.send(f"😒 **{ctx.author.name}** tried to generate another game without finishing the current one, what a fucking loser... 😒\n\nFinish your game first: {game_url}")
-        return
+async def generate_game(ctx, processing_msg, image_bytes=None):
+    """Generate the image for a game and post the game link
 
+    If image_bytes is given (a pre-generated background), the API call is skipped.
+    """
     try:
-        # Set the flag to indicate we're generating an image
-        generating_image = True
-
         async with ctx.typing():
-            # Send initial message
-            processing_msg = await ctx.send("Generating a 'Where's Benny?' image... This might take a minute!")
-
-            # Choose a random background prompt
-            background_prompt = random.choice(BACKGROUND_PROMPTS)
-
-            # Create prompt for Hugging Face - just generate the background
-            prompt = f"{background_prompt}, without any specific characters, highly detailed cartoon illustration"
-
-            # Generate image using Hugging Face
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "negative_prompt": "blurry, distorted, low quality"
-                }
-            }
-
-            # Send request to Hugging Face
-            response = requests.post(HUGGINGFACE_API_URL, headers=headers, json=payload)
-
-            # Check if the model is still loading
-            while response.status_code == 503 and "estimated_time" in response.json():
-                wait_time = response.json()["estimated_time"]
-                await processing_msg.edit(content=f"The image generation model is still loading. Waiting for {wait_time} seconds...")
-                time.sleep(min(wait_time, 10))
-                response = requests.post(HUGGINGFACE_API_URL, headers=headers, json=payload)
+            if not image_bytes:
+                await processing_msg.edit(content="Generating a 'Where's Benny?' image... This might take a minute!")
+
+                # Choose a random background prompt
+                background_prompt = random.choice(BACKGROUND_PROMPTS)
+                payload = build_payload(background_prompt)
+
+                # Let players know when the model is still loading
+                async def on_loading(wait_time):
+                    await processing_msg.edit(content=f"The image generation model is still loading. Waiting for {wait_time} seconds...")
+
+                # Send request to Hugging Face without blocking the event loop, unless another
+                # channel's game is already generating a background this one can share
+                try:
+                    image_bytes = await shared_backgrounds.get(
+                        ctx.channel.id, lambda: image_client.generate(payload, on_loading=on_loading))
+                except hf_client.GenerationError as e:
+                    await processing_msg.edit(content=f"Error generating image: {e.status} - {e.text}")
+                    return
 
             # Get the image data
-            if response.status_code == 200:
-                # Convert the response to an image
-                background_img = Image.open(io.BytesIO(response.content))
-
-                # Calculate Benny's size and position
-                benny_img = resize_benny(background_img)
-                if not benny_img:
+            if image_bytes:
+                # Decode, composite and encode (PNG, WebP, JPEG) in the image pipeline's worker threads
+                composite = await image_pipeline.run(compose_game_image, image_bytes)
+                if not composite:
                     await ctx.send("Sorry, I couldn't process Benny's image.")
                     return
 
-                b_width, b_height = benny_img.size
-
-                # Place Benny in a random grid cell
-                bg_width, bg_height = background_img.size
-                grid_x = random.randint(0, 2)  # 0, 1, or 2
-                grid_y = random.randint(0, 2)  # 0, 1, or 2
-                cell_width = bg_width // 3
-                cell_height = bg_height // 3
-                cell_x_start = grid_x * cell_width
-                cell_y_start = grid_y * cell_height
-                x_max = min(cell_x_start + cell_width, bg_width) - b_width
-                y_max = min(cell_y_start + cell_height, bg_height) - b_height
-                x_pos = random.randint(cell_x_start, max(cell_x_start, x_max))
-                y_pos = random.randint(cell_y_start, max(cell_y_start, y_max))
-
-                # Create a composite image
-                final_img = background_img.copy()
-                final_img.paste(benny_img, (x_pos, y_pos), benny_img)
+                x_pos, y_pos, b_width, b_height = composite.hitbox
 
                 # Delete the processing message
                 await processing_msg.delete()
@@ -488,7 +440,7 @@ async def where_is_benny(ctx):
 
                 # Register the game with the web server
                 game_id, game_url = web_server.create_game(
-                    final_img, x_pos, y_pos, b_width, b_height,
+                    composite.variants, x_pos, y_pos, b_width, b_height,
                     discord_channel_id, creator_id, creator_name,
                     web_server.finder_callback
                 )
@@ -519,15 +471,71 @@ async def where_is_benny(ctx):
                 embed.set_footer(text="First one to find Benny wins!")
 
                 await ctx.send(embed=embed)
-            else:
-                await processing_msg.edit(content=f"Error generating image: {response.status_code} - {response.text}")
 
     except Exception as e:
         await ctx.send(f"Sorry, I couldn't generate a 'Where's Benny?' image: {str(e)}")
 
-    finally:
-        # Reset the flag when done
-        generating_image = False
+@bot.command(name='whereisbenny', aliases=['wib'])
+async def where_is_benny(ctx):
+    """Generate a Where's Waldo style image featuring Benny with clickable web interface"""
+    # Avoid queueing more than one generation per user
+    if generation_queue.has_pending(ctx.author.id):
+        await ctx.send("I'm already generating an image for you! Please wait a moment.")
+        return
+
+    # Check if the user already has an active game
+    active_game = user_has_active_game(ctx.author.id)
+    if active_game:
+        # Get the game URL
+        base_url = web_server.get_public_url()
+        game_url = f"{base_url}/game/{active_game}"
+
+        # Send a sassy message
+        await ctx.send(f"😒 **{ctx.author.name}** tried to generate another game without finishing the current one, what a fucking loser... 😒\n\nFinish your game first: {game_url}")
+        return
+
+    # Check the rate limits for this user, channel and server
+    guild_id = ctx.guild.id if ctx.guild else None
+    limited_scope, wait = rate_limits.check(ctx.author.id, ctx.channel.id, guild_id)
+    if limited_scope:
+        remaining = int(wait) + 1
+        minutes = remaining // 60
+        seconds = remaining % 60
+        where = {"user": "", "channel": " in this channel", "guild": " on this server"}[limited_scope]
+        await ctx.send(f"{ctx.author.mention} Too many games{where} lately, you need to wait {minutes}m {seconds}s before generating another image.")
+        return
+
+    # Hand out a background straight away if one is ready: one another channel's
+    # game was made from (Benny is placed afresh), or a pre-generated one
+    image_bytes = shared_backgrounds.take(ctx.channel.id)
+    if not image_bytes:
+        image_bytes = background_pool.take()
+        if image_bytes:
+            shared_backgrounds.add(image_bytes, ctx.channel.id)
+    if image_bytes:
+        processing_msg = await ctx.send("Setting up your 'Where's Benny?' game...")
+        await generate_game(ctx, processing_msg, image_bytes)
+        return
+
+    # Send initial message (edited with queue position updates)
+    processing_msg = await ctx.send("Your 'Where's Benny?' game is queued...")
+
+    async def on_position(position):
+        await processing_msg.edit(content=f"Your 'Where's Benny?' game is #{position} in the queue. Hang tight!")
+
+    queue_key = guild_id or ctx.channel.id
+    job = GenerationJob(queue_key, ctx.author.id, lambda: generate_game(ctx, processing_msg), on_position)
+
+    try:
+        position = await generation_queue.submit(job)
+    except QueueFull as e:
+        # The game never started, so it doesn't count against the limits
+        rate_limits.refund(ctx.author.id, ctx.channel.id, guild_id)
+        await processing_msg.edit(content=f"Sorry, too many games are being generated right now ({e}). Please try again in a few minutes.")
+        return
+
+    if position:
+        await on_position(position)
 
 @bot.event
 async def on_message(message):
@@ -538,13 +546,9 @@ async def on_message(message):
 
     # Check if the message contains the trigger phrase
     if message.content.lower() == "where is benny?":
-        user_id = str(message.author.id)
-        current_time = time.time()
-
-        # First check if we're already generating an image
-        global generating_image
-        if generating_image:
-            await message.channel.send("I'm already generating an image. Please wait...")
+        # First check if we're already generating an image for this user
+        if generation_queue.has_pending(message.author.id):
+            await message.channel.send("I'm already generating an image for you. Please wait...")
             return
 
         # Check if the user already has an active game
@@ -558,28 +562,14 @@ async def on_message(message):
             await message.channel.send(f"😒 **{message.author.name}** tried to generate another game without finishing the current one, what a fucking loser... 😒\n\nFinish your game first: {game_url}")
             return
 
-        # Check if this user has generated an image recently (within cooldown period)
-        if user_id in last_generated and current_time - last_generated[user_id] < 600:  # 10 minute cooldown
-            # Calculate remaining cooldown
-            remaining = int(600 - (current_time - last_generated[user_id]))
-            minutes = remaining // 60
-            seconds = remaining % 60
-
-            # Send cooldown message
-            await message.channel.send(f"{message.author.mention} You need to wait {minutes}m {seconds}s before generating another image.")
-            return
+        # Process the request (where_is_benny applies the rate limits)
+        ctx = await bot.get_context(message)
+        if ctx.valid:
+            await where_is_benny(ctx)
         else:
-            # Update timestamp for this user
-            last_generated[user_id] = current_time
-
-            # Process the request
-            ctx = await bot.get_context(message)
-            if ctx.valid:
-                await where_is_benny(ctx)
-            else:
-                # Create a custom context if needed
-                await message.channel.trigger_typing()
-                await where_is_benny(ctx)
+            # Create a custom context if needed
+            await message.channel.trigger_typing()
+            await where_is_benny(ctx)
     else:
         # Process commands
         await bot.process_commands(message)
@@ -593,26 +583,65 @@ async def benny_help_command(ctx):
 `!whereisbenny` - Same as above, generate a Where's Waldo style image
 `!wib` - Same as above, generate a Where's Waldo style image
 `!bennyhelp` - Display this help message
+`!bennystats` - Display generation queue and background pool stats
     """
     await ctx.send(help_message)
 
+@bot.command(name='bennystats')
+async def benny_stats_command(ctx):
+    """Display generation queue and background pool statistics"""
+    stats = background_pool.stats()
+    avg_refill = stats["avg_refill_time"]
+    last_refill = stats["last_refill_time"]
+    per_category = ", ".join(f"{category}: {count}" for category, count in stats["per_category"].items())
+    image_stats = web_server.image_store.stats()
+    expiry_stats = web_server.expiry_scheduler.stats()
+    event_stats = web_server.event_hub.stats()
+    notify_stats = notifier.stats()
+    limit_stats = rate_limits.stats()
+    shared_stats = shared_backgrounds.stats()
+    channel_games = len(web_server.active_games.games_in_channel(ctx.channel.id))
+    tracked = ", ".join(f"{scope}: {count}" for scope, count in limit_stats["tracked"].items())
+    notify_latency = notify_stats["avg_latency"]
+    max_lag = expiry_stats["max_lag"]
+    avg_lag = expiry_stats["avg_lag"]
+    stats_message = f"""
+**Where's Benny Stats**
+Active games: {len(web_server.active_games)} ({channel_games} in this channel)
+Generation queue: {len(generation_queue)} waiting, {generation_queue.running} generating
+Background pool: {stats["size"]} ready ({per_category})
+Pool hits/misses: {stats["hits"]}/{stats["misses"]} ({stats["hit_rate"]:.0%} hit rate)
+Refills: {stats["refills"]} ({stats["refill_failures"]} failed, {stats["evictions"]} evicted)
+Refill time: avg {f"{avg_refill:.1f}s" if avg_refill is not None else "n/a"}, last {f"{last_refill:.1f}s" if last_refill is not None else "n/a"}
+Shared backgrounds: {shared_stats["ready"]} ready, {shared_stats["generating"]} generating, {shared_stats["reused"]} games reused one of {shared_stats["generations"]} generations
+Expired games: {expiry_stats["expired_games"]} in {expiry_stats["batches"]} batches, lag avg {f"{avg_lag * 1000:.0f}ms" if avg_lag is not None else "n/a"}, max {max_lag * 1000:.0f}ms
+Game images: {image_stats["memory_images"]} in memory ({image_stats["memory_bytes"] / 1048576:.1f}/{image_stats["memory_budget"] / 1048576:.0f} MB), {image_stats["disk_images"]} on disk
+Live pages: {event_stats["clients"]} open on {event_stats["games"]} games, {event_stats["events_sent"]} events pushed
+Notifications: {notify_stats["queued"]} queued, {notify_stats["sent_messages"]} sent in {notify_stats["sent_batches"]} messages ({notify_stats["retries"]} retries, {notify_stats["failures"]} failed), latency avg {f"{notify_latency:.1f}s" if notify_latency is not None else "n/a"}, max {notify_stats["max_latency"]:.1f}s
+Rate limits: {limit_stats["limited"]} requests limited, tracking {tracked or "nothing"}
+    """
+    await ctx.send(stats_message)
+
 # Callback function for when someone finds Benny
 async def benny_found_callback(finder_name, channel_id, creator_name):
-    try:
-        # Get the channel
-        channel = bot.get_channel(int(channel_id))
-        if channel:
-            # Send a message to the channel
-            await channel.send(f"🎉 **{finder_name}** found Benny in {creator_name}'s game! 🎉")
-    except Exception as e:
-        print(f"Error in benny_found_callback: {e}")
+    await notifier.notify(channel_id, f"🎉 **{finder_name}** found Benny in {creator_name}'s game! 🎉")
 
-# Simple wrapper to bridge the web server callbacks to async Discord methods
+# Bridge from the web server's handler threads to the bot's event loop
 def finder_callback_wrapper(finder_name, channel_id, creator_name):
-    bot.loop.create_task(benny_found_callback(finder_name, channel_id, creator_name))
+    asyncio.run_coroutine_threadsafe(benny_found_callback(finder_name, channel_id, creator_name), bot.loop)
+
+# Callback function for when a game expires without anyone finding Benny
+async def game_expired_callback(channel_id, creator_name):
+    await notifier.notify(channel_id, f"⌛ {creator_name}'s game expired, nobody found Benny!")
+
+# Bridge from the web server's expiry thread to the bot's event loop
+def expired_callback_wrapper(channel_id, creator_name):
+    asyncio.run_coroutine_threadsafe(game_expired_callback(channel_id, creator_name), bot.loop)
 
-# Store our callback in the web server module
+# Store our callbacks in the web server module
 web_server.finder_callback = finder_callback_wrapper
+if EXPIRY_NOTICES:
+    web_server.expired_callback = expired_callback_wrapper
 
 def main():
     """Main entry point for the bot"""
@@ -622,6 +651,8 @@ def main():
     # Check for Benny image
     if os.path.exists(BENNY_IMAGE_PATH):
         print("✅ Benny image found!")
+        benny_sprite.load()
+        print(f"Pre-scaled {len(benny_sprite)} Benny sprites")
     else:
         print("❌ Benny image NOT found! Please make sure to save the image to this location.")
         print(f"Expected path: {BENNY_IMAGE_PATH}")
@@ -638,7 +669,9 @@ def main():
         print("Make sure to set DISCORD_TOKEN in your .env file or as environment variable.")
         return
 
-    if not os.getenv("HUGGINGFACE_API_KEY"):
+    if image_generators.IMAGE_BACKEND != "huggingface":
+        print(f"Using the {image_generators.IMAGE_BACKEND!r} image backend instead of Hugging Face")
+    elif not os.getenv("HUGGINGFACE_API_KEY"):
         print("WARNING: No Hugging Face API key found. Image generation won't work.")
 
     # Set server hostname if provided